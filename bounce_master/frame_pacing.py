@@ -0,0 +1,127 @@
+"""Frame pacing for the asyncio game loop.
+
+clock.tick(FPS) blocks the whole thread while it waits for the next frame.
+FramePacer.wait() waits on the event loop instead, so pending I/O (such as
+leaderboard requests) runs during the idle part of every frame.
+
+FixedTimestep decouples the simulation from rendering: the game advances in
+fixed ticks based on real elapsed time, however long each rendered frame
+takes, and FrameSkipPolicy optionally skips drawing when frames run over
+their time budget.
+"""
+import asyncio
+import time
+
+# asyncio.sleep can wake up a little late; the last stretch before the
+# deadline is spent yielding to the event loop instead of sleeping
+SPIN_MARGIN = 0.002
+
+
+class FramePacer:
+    def __init__(self, fps, clock=time.perf_counter):
+        self.frame_time = 1.0 / fps
+        self.clock = clock
+        self.deadline = None
+        self.last_frame = None
+        self.dt = self.frame_time  # Length of the previous frame in seconds
+        self.late_frames = 0       # Frames that overran their deadline
+
+    async def wait(self):
+        """Yield to the event loop until the next frame is due"""
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.frame_time
+
+        remaining = self.deadline - now
+        if remaining < 0:
+            # Running behind: start the next frame right away and pace from
+            # here rather than rushing to catch up on the missed frames
+            self.late_frames += 1
+            self.deadline = now
+            await asyncio.sleep(0)
+        else:
+            if remaining > SPIN_MARGIN:
+                await asyncio.sleep(remaining - SPIN_MARGIN)
+            while self.clock() < self.deadline:
+                await asyncio.sleep(0)
+
+        now = self.clock()
+        if self.last_frame is not None:
+            self.dt = now - self.last_frame
+        self.last_frame = now
+        return self.dt
+
+    def get_fps(self):
+        return 1.0 / self.dt if self.dt > 0 else 0.0
+
+
+class FixedTimestep:
+    """Accumulator that turns real elapsed time into fixed simulation ticks"""
+
+    def __init__(self, tick_rate, max_ticks_per_frame=5, clock=time.perf_counter):
+        self.tick_time = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last_time = None
+        self.dropped_time = 0.0  # Real time not simulated because of the clamp
+
+    def advance(self):
+        """Number of ticks to simulate for the time passed since the last call"""
+        now = self.clock()
+        if self.last_time is not None:
+            self.accumulator += now - self.last_time
+        self.last_time = now
+
+        ticks = int(self.accumulator / self.tick_time)
+        self.accumulator -= ticks * self.tick_time
+        if ticks > self.max_ticks_per_frame:
+            # Spiral-of-death clamp: after a long stall (a slow frame, a
+            # blocking call, the window being dragged) slow the game down
+            # instead of simulating ever more ticks to catch up
+            self.dropped_time += (ticks - self.max_ticks_per_frame) * self.tick_time
+            ticks = self.max_ticks_per_frame
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far real time is between the last two ticks (0-1), for drawing"""
+        return min(1.0, self.accumulator / self.tick_time)
+
+
+class FrameSkipPolicy:
+    """Skip drawing frames while frame times run over a budget.
+
+    The smoothed time spent per frame (simulation plus drawing) is compared
+    with budget; while it is over, up to max_skipped frames in a row are
+    simulated but not drawn. max_skipped=0 turns skipping off.
+    """
+
+    def __init__(self, budget, max_skipped=2, smoothing=0.2, clock=time.perf_counter):
+        self.budget = budget
+        self.max_skipped = max_skipped
+        self.smoothing = smoothing
+        self.clock = clock
+        self.frame_start = None
+        self.average_frame_time = 0.0
+        self.skipped_in_a_row = 0
+        self.skipped_frames = 0
+
+    def begin_frame(self):
+        self.frame_start = self.clock()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        frame_time = self.clock() - self.frame_start
+        self.average_frame_time += (frame_time - self.average_frame_time) * self.smoothing
+
+    def should_render(self):
+        if (self.average_frame_time > self.budget and
+                self.skipped_in_a_row < self.max_skipped):
+            self.skipped_in_a_row += 1
+            self.skipped_frames += 1
+            return False
+        self.skipped_in_a_row = 0
+        return True
@@ -1,6 +1,18 @@
+import asyncio
 import requests
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from local_leaderboard import LocalLeaderboard, CachedLeaderboard
+
+# Local leaderboard used when no API endpoint is configured, and the local
+# cache of the remote leaderboard when one is
+LOCAL_LEADERBOARD_FILE = os.environ.get('BOUNCE_LEADERBOARD_FILE', 'leaderboard.bmlb')
+LEADERBOARD_CACHE_FILE = os.environ.get('BOUNCE_LEADERBOARD_CACHE', 'leaderboard_cache.bmlb')
+
+# Seconds to wait for the API before giving up on a request
+REQUEST_TIMEOUT = 5
 
 
 
@@ -13,6 +25,10 @@ class LeaderboardAPI:
         if not self.api_endpoint or not self.api_key:
             raise ValueError("API endpoint and API key must be provided")
 
+        # Reuse one connection pool for all requests instead of a new
+        # TCP/TLS handshake per call
+        self.session = requests.Session()
+
     def submit_score(self, player_name, score):
         """Submit a score to the leaderboard via API"""
         headers = {
@@ -24,10 +40,11 @@ class LeaderboardAPI:
             "score": score
         }
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_endpoint}/scores",
                 headers=headers,
-                data=json.dumps(data)
+                data=json.dumps(data),
+                timeout=REQUEST_TIMEOUT
             )
             if response.status_code == 200:
                 print(f"Successfully submitted score for {player_name}")
@@ -45,9 +62,10 @@ class LeaderboardAPI:
             "x-api-key": self.api_key
         }
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.api_endpoint}/scores/top?limit={limit}",
-                headers=headers
+                headers=headers,
+                timeout=REQUEST_TIMEOUT
             )
             if response.status_code == 200:
                 return json.loads(response.json().get('body', {})).get('scores', [])
@@ -58,6 +76,38 @@ class LeaderboardAPI:
             print(f"Error getting top scores: {e}")
             return []
 
+    def close(self):
+        self.session.close()
+
+class AsyncLeaderboard:
+    """Awaitable wrapper around a leaderboard client (LeaderboardAPI, Leaderboard,
+    LocalLeaderboard or CachedLeaderboard).
+
+    Calls run on a single background thread, so the wrapped client (and its
+    connection pool) is only ever used from one thread at a time and the
+    game loop never blocks on the network.
+    """
+    def __init__(self, leaderboard):
+        self.leaderboard = leaderboard
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leaderboard")
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def submit_score(self, player_name, score):
+        """Submit a score to the leaderboard"""
+        return await self._run(self.leaderboard.submit_score, player_name, score)
+
+    async def get_top_scores(self, limit=10):
+        """Get the top scores from the leaderboard"""
+        return await self._run(self.leaderboard.get_top_scores, limit)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        if hasattr(self.leaderboard, 'close'):
+            self.leaderboard.close()
+
 # Helper function to initialize the leaderboard API
 def initialize_leaderboard_api():
     # You can set these values directly here or use environment variables
@@ -66,11 +116,23 @@ def initialize_leaderboard_api():
     api_key = os.environ.get('LEADERBOARD_API_KEY')
 
     if not api_endpoint or not api_key:
-        print("Warning: API endpoint or API key not set. Leaderboard functionality will be disabled.")
-        return None
+        print("Warning: API endpoint or API key not set. Using the local leaderboard.")
+        return open_local_leaderboard(LOCAL_LEADERBOARD_FILE)
 
     try:
-        return LeaderboardAPI(api_endpoint, api_key)
+        remote = LeaderboardAPI(api_endpoint, api_key)
     except Exception as e:
         print(f"Error initializing leaderboard API: {e}")
         return None
+
+    # Serve the leaderboard screen from a local copy of the remote board
+    cache = open_local_leaderboard(LEADERBOARD_CACHE_FILE)
+    return CachedLeaderboard(remote, cache) if cache is not None else remote
+
+
+def open_local_leaderboard(path):
+    try:
+        return LocalLeaderboard(path)
+    except (OSError, ValueError) as e:
+        print(f"Error opening local leaderboard {path}: {e}")
+        return None
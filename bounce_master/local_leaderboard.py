@@ -0,0 +1,306 @@
+"""Local high-score store for kiosks without (or in front of) the remote leaderboard.
+
+LocalLeaderboard implements the same submit_score/get_top_scores interface
+as LeaderboardAPI and Leaderboard, backed by one fixed-size memory-mapped
+file:
+
+    header   magic "BMLB", version, capacity K, log capacity L
+    table 0  seq, count, crc32, K entries sorted by score
+    table 1  (same layout)
+    log      L records: seq, score, timestamp, name, crc32 (ring buffer)
+
+A submission is first appended to the log and flushed, then a new sorted
+table is written to the table slot that is not current and flushed. On
+open, the valid table with the highest seq wins and any newer log records
+are replayed, so a crash at any point loses at most the submission that
+was being written. Reading the top K is a slice of the current table, no
+matter how many scores were ever submitted.
+
+CachedLeaderboard puts a LocalLeaderboard in front of the remote board as
+a read-through cache so the leaderboard screen can render immediately.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+MAGIC = b"BMLB"
+VERSION = 1
+DEFAULT_CAPACITY = 100
+DEFAULT_LOG_CAPACITY = 1024
+NAME_BYTES = 32
+
+_header = struct.Struct("<4sHHI20x")       # 32 bytes
+_table_header = struct.Struct("<QII")      # seq, count, crc32
+_entry = struct.Struct("<qq32s")           # score, timestamp (ms), name
+_log_record = struct.Struct("<Qqq32sI4x")  # seq, score, timestamp, name, crc32
+
+
+def _encode_name(name):
+    # Truncate to NAME_BYTES without splitting a UTF-8 character
+    return str(name).encode("utf-8")[:NAME_BYTES].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _parse_timestamp(value):
+    # Remote entries carry an ISO 8601 UTC timestamp; 0 when missing
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", ""))
+    except ValueError:
+        return 0
+    return int(parsed.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _entry_dict(score, timestamp, name):
+    # Same shape as the remote leaderboard's entries
+    return {
+        'player_name': name.rstrip(b"\0").decode("utf-8", "replace"),
+        'score': score,
+        'timestamp': (datetime.fromtimestamp(timestamp / 1000, timezone.utc)
+                      .replace(tzinfo=None).isoformat() if timestamp else None),
+    }
+
+
+class LocalLeaderboard:
+    def __init__(self, path, capacity=DEFAULT_CAPACITY, log_capacity=DEFAULT_LOG_CAPACITY):
+        """Open the leaderboard file at path, creating it if needed.
+
+        capacity and log_capacity only apply to a new file; an existing file
+        keeps the sizes it was created with.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.map = None
+        if not os.path.exists(path):
+            self._create(path, capacity, log_capacity)
+
+        self.file = open(path, "r+b")
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        magic, version, self.capacity, self.log_capacity = _header.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a leaderboard file")
+        self.table_size = _table_header.size + self.capacity * _entry.size
+        self.log_offset = _header.size + 2 * self.table_size
+        if len(self.map) < self.log_offset + self.log_capacity * _log_record.size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+
+        self._top_scores = None  # Decoded copy of the current table
+        self._recover()
+
+    @staticmethod
+    def _create(path, capacity, log_capacity):
+        size = (_header.size + 2 * (_table_header.size + capacity * _entry.size) +
+                log_capacity * _log_record.size)
+        data = bytearray(size)
+        _header.pack_into(data, 0, MAGIC, VERSION, capacity, log_capacity)
+        # Write the whole file under a temporary name so a crash can never
+        # leave a half-initialized leaderboard behind
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    # -- Tables --------------------------------------------------------------
+
+    def _table_offset(self, slot):
+        return _header.size + slot * self.table_size
+
+    def _read_table(self, slot):
+        """(seq, entries) of a table slot, or None if it fails its checksum"""
+        offset = self._table_offset(slot)
+        seq, count, crc = _table_header.unpack_from(self.map, offset)
+        body_start = offset + _table_header.size
+        if count > self.capacity:
+            return None
+        body = self.map[body_start:body_start + count * _entry.size]
+        if zlib.crc32(struct.pack("<QI", seq, count) + body) != crc:
+            return None
+        return seq, [_entry.unpack_from(body, i * _entry.size) for i in range(count)]
+
+    def _write_table(self, seq, entries):
+        slot = 1 - self.active_slot
+        offset = self._table_offset(slot)
+        body = b"".join(_entry.pack(*entry) for entry in entries)
+        crc = zlib.crc32(struct.pack("<QI", seq, len(entries)) + body)
+        body_start = offset + _table_header.size
+        self.map[body_start:body_start + len(body)] = body
+        _table_header.pack_into(self.map, offset, seq, len(entries), crc)
+        self.map.flush()
+        self.active_slot, self.seq, self.entries = slot, seq, entries
+        self._top_scores = None
+
+    # -- Log -----------------------------------------------------------------
+
+    def _log_position(self, seq):
+        return self.log_offset + (seq % self.log_capacity) * _log_record.size
+
+    def _read_log(self, seq):
+        """(score, timestamp, name) logged with seq, or None"""
+        record = self.map[self._log_position(seq):self._log_position(seq) + _log_record.size]
+        logged_seq, score, timestamp, name, crc = _log_record.unpack(record)
+        if logged_seq != seq or zlib.crc32(record[:_log_record.size - 8]) != crc:
+            return None
+        return score, timestamp, name
+
+    def _append_log(self, seq, score, timestamp, name):
+        record = bytearray(_log_record.pack(seq, score, timestamp, name, 0))
+        struct.pack_into("<I", record, _log_record.size - 8,
+                         zlib.crc32(record[:_log_record.size - 8]))
+        position = self._log_position(seq)
+        self.map[position:position + _log_record.size] = record
+        self.map.flush()
+
+    # -- Recovery and updates ------------------------------------------------
+
+    def _recover(self):
+        tables = [self._read_table(0), self._read_table(1)]
+        valid = [(table[0], slot) for slot, table in enumerate(tables) if table is not None]
+        if valid:
+            seq, slot = max(valid)
+            self.active_slot, self.seq, self.entries = slot, seq, tables[slot][1]
+        else:
+            self.active_slot, self.seq, self.entries = 1, 0, []
+
+        # Apply submissions that were logged but never made it into a table
+        while True:
+            logged = self._read_log(self.seq + 1)
+            if logged is None:
+                break
+            self._write_table(self.seq + 1, self._insert(self.entries, *logged))
+
+    def _insert(self, entries, score, timestamp, name):
+        # Highest score first; ties keep the earlier entry ahead
+        position = len(entries)
+        for i, entry in enumerate(entries):
+            if entry[0] < score:
+                position = i
+                break
+        new_entries = list(entries)
+        new_entries.insert(position, (score, timestamp, name))
+        return new_entries[:self.capacity]
+
+    def submit_score(self, player_name, score):
+        """Submit a score to the local leaderboard"""
+        try:
+            with self.lock:
+                seq = self.seq + 1
+                timestamp = int(time.time() * 1000)
+                name = _encode_name(player_name)
+                self._append_log(seq, int(score), timestamp, name)
+                self._write_table(seq, self._insert(self.entries, int(score), timestamp, name))
+            print(f"Added score {score} for player {player_name} to the local leaderboard")
+            return True
+        except Exception as e:
+            print(f"Error submitting score: {e}")
+            return False
+
+    def replace_scores(self, scores):
+        """Replace the whole table with scores (dicts as from get_top_scores)"""
+        entries = []
+        for item in scores:
+            try:
+                score = int(item.get('score', 0))
+            except (TypeError, ValueError):
+                continue
+            entries.append((score, _parse_timestamp(item.get('timestamp')),
+                            _encode_name(item.get('player_name', 'Unknown'))))
+        entries.sort(key=lambda entry: -entry[0])
+        with self.lock:
+            if self.map is None:
+                return
+            # Not logged: this is a copy of another board, not a submission,
+            # and there is nothing to replay if the table write is torn
+            self._write_table(self.seq + 1, entries[:self.capacity])
+
+    def get_top_scores(self, limit=10):
+        """Get the top scores from the local leaderboard"""
+        with self.lock:
+            if self._top_scores is None:
+                self._top_scores = [_entry_dict(*entry) for entry in self.entries]
+            return [dict(entry) for entry in self._top_scores[:limit]]
+
+    def close(self):
+        with self.lock:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            self.file.close()
+
+
+class CachedLeaderboard:
+    """Read-through cache: serves top scores from a LocalLeaderboard and
+    refreshes it from the remote leaderboard in the background.
+
+    Submissions and refreshes hold one lock while they use the remote
+    client, so it is never used from two threads at once and a refresh
+    cannot overwrite the cache with scores fetched before a submission.
+    """
+
+    def __init__(self, remote, cache, refresh_interval=30.0):
+        self.remote = remote
+        self.cache = cache
+        self.refresh_interval = refresh_interval
+        self.last_refresh = None
+        self.lock = threading.Lock()
+        self.submissions = 0  # Counts submit_score calls, to spot stale refreshes
+        self.refresh_pending = False
+        self.closed = False
+
+    def submit_score(self, player_name, score):
+        """Submit to the remote leaderboard; the cache shows the score right away"""
+        with self.lock:
+            self.submissions += 1
+            self.cache.submit_score(player_name, score)
+            submitted = self.remote.submit_score(player_name, score)
+            self.last_refresh = None  # The remote board changed; refresh on next read
+        return submitted
+
+    def get_top_scores(self, limit=10):
+        """Top scores from the cache; fetched from the remote board on a cold cache"""
+        scores = self.cache.get_top_scores(limit)
+        if not scores:
+            self.refresh()
+            return self.cache.get_top_scores(limit)
+        stale = (self.last_refresh is None or
+                 time.monotonic() - self.last_refresh > self.refresh_interval)
+        if stale and not self.refresh_pending:
+            self.refresh_pending = True
+            threading.Thread(target=self._refresh_in_background, args=(self.submissions,),
+                             name="leaderboard-refresh", daemon=True).start()
+        return scores
+
+    def _refresh_in_background(self, submissions):
+        try:
+            self.refresh(submissions)
+        finally:
+            self.refresh_pending = False
+
+    def refresh(self, submissions=None):
+        """Replace the cache with the remote top scores.
+
+        Skipped if a score was submitted since the refresh was requested
+        (submissions is the count at that time); the next read asks again.
+        """
+        with self.lock:
+            if self.closed or submissions not in (None, self.submissions):
+                return
+            scores = self.remote.get_top_scores(self.cache.capacity)
+            # An empty list is how the remote client reports errors too
+            if scores:
+                self.cache.replace_scores(scores)
+            self.last_refresh = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            if hasattr(self.remote, 'close'):
+                self.remote.close()
+            self.cache.close()
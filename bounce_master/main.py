@@ -1,12 +1,17 @@
+import asyncio
 import pygame
 import sys
 import random
 import math
 import os
 
+from frame_pacing import FramePacer, FixedTimestep, FrameSkipPolicy
+from render import create_renderer
+import telemetry
+
 # Try to import the leaderboard API client
 try:
-    from leaderboard_api import initialize_leaderboard_api
+    from leaderboard_api import initialize_leaderboard_api, AsyncLeaderboard
     # Try to import API configuration
     try:
         from config import API_ENDPOINT, API_KEY
@@ -23,7 +28,12 @@ pygame.init()
 # Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # Simulation ticks per second; timers below count ticks
+RENDER_FPS = 60  # Frames drawn per second, independent of the simulation
+MAX_TICKS_PER_FRAME = 5  # Beyond this the game slows down instead of catching up
+MAX_SKIPPED_FRAMES = 0  # Set to e.g. 2 to skip drawing frames that run over budget
+TELEMETRY_DIR = os.environ.get('BOUNCE_TELEMETRY_DIR', 'telemetry')
+SUBMIT_TIMEOUT = 15  # Seconds on the "Submitting score..." screen before giving up
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
@@ -35,11 +45,18 @@ ORANGE = (255, 165, 0)
 CYAN = (0, 255, 255)
 GRAY = (128, 128, 128)
 
-# Set up the display
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Bounce Master")
+# The display is created by init_display() so the game classes can be
+# imported (e.g. by the network host) without opening a window. screen is a
+# render backend (see render.py): everything draws in SCREEN_WIDTH x
+# SCREEN_HEIGHT logical coordinates and the backend scales to the display.
+screen = None
 clock = pygame.time.Clock()
 
+def init_display(caption="Bounce Master"):
+    global screen
+    screen = create_renderer((SCREEN_WIDTH, SCREEN_HEIGHT), caption)
+    return screen
+
 class Player:
     def __init__(self):
         self.width = 200  # Increased width as suggested
@@ -52,9 +69,11 @@ class Player:
         self.original_speed = 8
         self.power_up_timer = 0
         self.active_power_ups = []
+        self.prev_x = self.x  # Position at the previous tick, for drawing
 
-    def draw(self):
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
+    def draw(self, alpha=1.0):
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        screen.rect(self.color, (x, self.y, self.width, self.height))
 
     def move(self, direction):
         if direction == "left" and self.x > 0:
@@ -63,6 +82,7 @@ class Player:
             self.x += self.speed
 
     def update(self, keys):
+        self.prev_x = self.x
         if keys[pygame.K_LEFT]:
             self.move("left")
         if keys[pygame.K_RIGHT]:
@@ -104,11 +124,16 @@ class Ball:
         self.original_gravity = 0.2
         self.power_up_timer = 0
         self.active_power_ups = []
+        self.prev_x, self.prev_y = self.x, self.y  # Position at the previous tick
 
-    def draw(self):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+    def draw(self, alpha=1.0):
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        screen.circle(self.color, (int(x), int(y)), self.radius)
 
     def update(self):
+        self.prev_x, self.prev_y = self.x, self.y
+
         # Update power-up timers
         if self.power_up_timer > 0:
             self.power_up_timer -= 1
@@ -186,11 +211,14 @@ class Obstacle:
         else:
             self.direction = -1  # Moving left
         self.color = GREEN
+        self.prev_x = self.x  # Position at the previous tick, for drawing
 
-    def draw(self):
-        pygame.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height))
+    def draw(self, alpha=1.0):
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        screen.rect(self.color, (x, self.y, self.width, self.height))
 
     def update(self):
+        self.prev_x = self.x
         self.x += self.speed * self.direction
 
     def is_off_screen(self):
@@ -243,13 +271,16 @@ class PowerUp:
             self.color = ORANGE  # Multi-ball
         elif self.type == "antigravity":
             self.color = WHITE   # Anti-gravity
+        self.prev_y = self.y  # Position at the previous tick, for drawing
 
-    def draw(self):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.radius)
+    def draw(self, alpha=1.0):
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        screen.circle(self.color, (int(self.x), int(y)), self.radius)
         # Draw a small inner circle to make it look like a power-up
-        pygame.draw.circle(screen, BLACK, (int(self.x), int(self.y)), self.radius // 2)
+        screen.circle(BLACK, (int(self.x), int(y)), self.radius // 2)
 
     def update(self):
+        self.prev_y = self.y
         self.y += self.speed_y
 
     def is_out_of_bounds(self):
@@ -264,7 +295,14 @@ class PowerUp:
             return True
         return False
 
-def main():
+async def submit_and_fetch_scores(leaderboard, player_name, score):
+    """Submit a score, then fetch the updated top 10"""
+    await leaderboard.submit_score(player_name, score)
+    return await leaderboard.get_top_scores(10)
+
+async def run_game():
+    init_display()
+
     # Try to initialize the leaderboard API
     try:
         leaderboard_api = initialize_leaderboard_api()
@@ -272,6 +310,12 @@ def main():
     except Exception as e:
         print(f"Could not initialize leaderboard API: {e}")
         leaderboard_available = False
+    # Leaderboard calls are awaited so the game keeps rendering meanwhile
+    leaderboard = AsyncLeaderboard(leaderboard_api) if leaderboard_available else None
+    submit_task = None
+
+    # Per-session events, written to TELEMETRY_DIR in the background
+    recorder = telemetry.TelemetryRecorder(TELEMETRY_DIR, FPS)
 
     player = Player()
     balls = [Ball()]
@@ -289,6 +333,7 @@ def main():
     GAME_OVER = 1
     ENTER_NAME = 2
     SHOW_LEADERBOARD = 3
+    SUBMITTING = 4
     game_state = GAME_PLAYING
 
     # Player name input
@@ -301,9 +346,15 @@ def main():
     font = pygame.font.SysFont(None, 36)
     small_font = pygame.font.SysFont(None, 24)
 
+    pacer = FramePacer(RENDER_FPS)
+    timestep = FixedTimestep(FPS, MAX_TICKS_PER_FRAME)
+    frame_skip = FrameSkipPolicy(1.0 / RENDER_FPS, MAX_SKIPPED_FRAMES)
+
     # Main game loop
     running = True
     while running:
+        frame_skip.begin_frame()
+
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -334,24 +385,12 @@ def main():
 
                 elif game_state == ENTER_NAME:
                     if event.key == pygame.K_RETURN and player_name.strip():
-                        # Submit score to leaderboard
+                        # Submit score to leaderboard in the background
                         if leaderboard_available:
-                            try:
-                                leaderboard_api.submit_score(player_name, score)
-                                top_scores = leaderboard_api.get_top_scores(10)
-                                game_state = SHOW_LEADERBOARD
-                            except Exception as e:
-                                print(f"Error submitting score: {e}")
-                                # Reset game if leaderboard submission fails
-                                player = Player()
-                                balls = [Ball()]
-                                obstacles = []
-                                power_ups = []
-                                score = 0
-                                game_over = False
-                                obstacle_timer = 0
-                                power_up_timer = 0
-                                game_state = GAME_PLAYING
+                            submit_task = asyncio.ensure_future(asyncio.wait_for(
+                                submit_and_fetch_scores(leaderboard, player_name, score),
+                                SUBMIT_TIMEOUT))
+                            game_state = SUBMITTING
                     elif event.key == pygame.K_BACKSPACE:
                         player_name = player_name[:-1]
                     elif len(player_name) < 15 and event.unicode.isalnum() or event.unicode == ' ':
@@ -370,10 +409,37 @@ def main():
                         power_up_timer = 0
                         game_state = GAME_PLAYING
 
+        # Pick up the leaderboard once the submission has finished
+        if game_state == SUBMITTING and submit_task.done():
+            try:
+                top_scores = submit_task.result()
+                game_state = SHOW_LEADERBOARD
+            except Exception as e:
+                print(f"Error submitting score: {e!r}")
+                # Reset game if leaderboard submission fails or times out
+                player = Player()
+                balls = [Ball()]
+                obstacles = []
+                power_ups = []
+                score = 0
+                game_over = False
+                obstacle_timer = 0
+                power_up_timer = 0
+                game_state = GAME_PLAYING
+            submit_task = None
+
         # Get key states
         keys = pygame.key.get_pressed()
 
-        if game_state == GAME_PLAYING:
+        # Run as many fixed simulation ticks as real time calls for, so game
+        # speed does not depend on how fast frames are rendered
+        for _ in range(timestep.advance()):
+            if game_state != GAME_PLAYING:
+                break
+            if not recorder.in_session:
+                recorder.start_session()
+            recorder.advance()
+
             # Update player
             player.update(keys)
 
@@ -384,10 +450,12 @@ def main():
                 # Check for paddle collision
                 if ball.check_paddle_collision(player):
                     score += 10
+                    recorder.record(telemetry.PADDLE_HIT)
 
                 # Check if ball is out of bounds
                 if ball.is_out_of_bounds():
                     balls.remove(ball)
+                    recorder.record(telemetry.BALL_LOST, len(balls))
                     if len(balls) == 0:
                         game_over = True
                         game_state = GAME_OVER
@@ -401,6 +469,7 @@ def main():
                     for ball in balls:
                         if obstacle.check_ball_collision(ball):
                             score += 5
+                            recorder.record(telemetry.OBSTACLE_HIT)
 
             # Update power-ups
             for power_up in power_ups[:]:
@@ -408,6 +477,7 @@ def main():
                 if power_up.is_out_of_bounds():
                     power_ups.remove(power_up)
                 elif power_up.check_paddle_collision(player):
+                    recorder.record(telemetry.POWER_UP, telemetry.power_up_code(power_up.type))
                     # Apply power-up effect
                     if power_up.type == "speed" or power_up.type == "size":
                         player.apply_power_up(power_up.type)
@@ -439,76 +509,94 @@ def main():
                 power_ups.append(PowerUp())
                 power_up_timer = 0
 
+        # A session ends when its game does; buffered events are written
+        # to disk in the background every few seconds
+        if game_state != GAME_PLAYING and recorder.in_session:
+            recorder.end_session(score)
+        recorder.maybe_flush()
+
+        # Keep simulating but don't draw while frames are over budget
+        if not frame_skip.should_render():
+            frame_skip.end_frame()
+            await pacer.wait()
+            continue
+
         # Draw everything
         screen.fill(BLACK)
 
-        # Draw game objects
+        # Draw game objects between the last two simulation ticks. Once the
+        # game stops, no ticks run and they stay at their final positions.
+        alpha = timestep.alpha if game_state == GAME_PLAYING else 1.0
         if game_state == GAME_PLAYING or game_state == GAME_OVER:
-            player.draw()
+            player.draw(alpha)
             for ball in balls:
-                ball.draw()
+                ball.draw(alpha)
             for obstacle in obstacles:
-                obstacle.draw()
+                obstacle.draw(alpha)
             for power_up in power_ups:
-                power_up.draw()
+                power_up.draw(alpha)
 
             # Draw score
-            score_text = font.render(f"Score: {score}", True, WHITE)
+            score_text = screen.render_text(font, f"Score: {score}", WHITE)
             screen.blit(score_text, (10, 10))
 
             # Draw active power-ups
             if player.active_power_ups:
-                power_up_text = font.render(f"Active: {', '.join(player.active_power_ups)}", True, WHITE)
+                power_up_text = screen.render_text(font, f"Active: {', '.join(player.active_power_ups)}", WHITE)
                 screen.blit(power_up_text, (10, 50))
 
             # Draw ball count
-            ball_text = font.render(f"Balls: {len(balls)}", True, WHITE)
+            ball_text = screen.render_text(font, f"Balls: {len(balls)}", WHITE)
             screen.blit(ball_text, (SCREEN_WIDTH - 120, 10))
 
             # Draw game over message
             if game_state == GAME_OVER:
-                game_over_text = font.render("GAME OVER", True, WHITE)
+                game_over_text = screen.render_text(font, "GAME OVER", WHITE)
                 screen.blit(game_over_text, (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 50))
 
                 if leaderboard_available and score > 0:
-                    submit_text = font.render("Press SPACE to submit your score", True, WHITE)
+                    submit_text = screen.render_text(font, "Press SPACE to submit your score", WHITE)
                     screen.blit(submit_text, (SCREEN_WIDTH//2 - submit_text.get_width()//2, SCREEN_HEIGHT//2))
                 else:
-                    restart_text = font.render("Press SPACE to restart", True, WHITE)
+                    restart_text = screen.render_text(font, "Press SPACE to restart", WHITE)
                     screen.blit(restart_text, (SCREEN_WIDTH//2 - restart_text.get_width()//2, SCREEN_HEIGHT//2))
 
         elif game_state == ENTER_NAME:
             # Draw name entry screen
-            title_text = font.render("Enter Your Name:", True, WHITE)
+            title_text = screen.render_text(font, "Enter Your Name:", WHITE)
             screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, SCREEN_HEIGHT//3))
 
             # Draw input box
             input_box = pygame.Rect(SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2 - 20, 300, 40)
-            pygame.draw.rect(screen, WHITE, input_box, 2)
+            screen.rect(WHITE, input_box, 2)
 
             # Draw entered name
-            name_text = font.render(player_name, True, WHITE)
+            name_text = screen.render_text(font, player_name, WHITE)
             screen.blit(name_text, (input_box.x + 10, input_box.y + 10))
 
             # Draw instructions
-            instructions = small_font.render("Press ENTER to submit", True, GRAY)
+            instructions = screen.render_text(small_font, "Press ENTER to submit", GRAY)
             screen.blit(instructions, (SCREEN_WIDTH//2 - instructions.get_width()//2, input_box.y + 60))
 
             # Draw final score
-            score_text = font.render(f"Your Score: {score}", True, WHITE)
+            score_text = screen.render_text(font, f"Your Score: {score}", WHITE)
             screen.blit(score_text, (SCREEN_WIDTH//2 - score_text.get_width()//2, input_box.y - 60))
 
+        elif game_state == SUBMITTING:
+            submitting_text = screen.render_text(font, "Submitting score...", WHITE)
+            screen.blit(submitting_text, (SCREEN_WIDTH//2 - submitting_text.get_width()//2, SCREEN_HEIGHT//2))
+
         elif game_state == SHOW_LEADERBOARD:
             # Draw leaderboard screen
-            title_text = font.render("LEADERBOARD", True, WHITE)
+            title_text = screen.render_text(font, "LEADERBOARD", WHITE)
             screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
 
              # Add debug information
             if not top_scores:
-                debug_text = small_font.render("No scores available or error loading scores", True, RED)
+                debug_text = screen.render_text(small_font, "No scores available or error loading scores", RED)
                 screen.blit(debug_text, (SCREEN_WIDTH//2 - debug_text.get_width()//2, 100))
             else:
-                debug_text = small_font.render(f"Loaded {len(top_scores)} scores", True, GREEN)
+                debug_text = screen.render_text(small_font, f"Loaded {len(top_scores)} scores", GREEN)
                 screen.blit(debug_text, (SCREEN_WIDTH//2 - debug_text.get_width()//2, 100))
 
             # Draw leaderboard entries
@@ -516,9 +604,9 @@ def main():
             y_pos = 120
             for i, entry in enumerate(top_scores):
                 try:
-                    rank_text = font.render(f"{i+1}.", True, WHITE)
-                    name_text = font.render(str(entry.get('player_name', 'Unknown')), True, WHITE)
-                    score_text = font.render(str(entry.get('score', 0)), True, WHITE)
+                    rank_text = screen.render_text(font, f"{i+1}.", WHITE)
+                    name_text = screen.render_text(font, str(entry.get('player_name', 'Unknown')), WHITE)
+                    score_text = screen.render_text(font, str(entry.get('score', 0)), WHITE)
 
                     screen.blit(rank_text, (SCREEN_WIDTH//4 - 30, y_pos))
                     screen.blit(name_text, (SCREEN_WIDTH//4, y_pos))
@@ -526,26 +614,35 @@ def main():
 
                     y_pos += 40
                 except Exception as e:
-                    error_text = small_font.render(f"Error displaying entry {i}: {str(e)}", True, RED)
+                    error_text = screen.render_text(small_font, f"Error displaying entry {i}: {str(e)}", RED)
                     screen.blit(error_text, (SCREEN_WIDTH//2 - error_text.get_width()//2, y_pos))
                     y_pos += 20
 
             # Draw instructions
-            instructions = font.render("Press SPACE to play again", True, WHITE)
+            instructions = screen.render_text(font, "Press SPACE to play again", WHITE)
             screen.blit(instructions, (SCREEN_WIDTH//2 - instructions.get_width()//2, SCREEN_HEIGHT - 100))
 
             # Highlight player's score if it's in the leaderboard
             for i, entry in enumerate(top_scores):
                 if entry.get('player_name') == player_name and entry.get('score') == score:
                     highlight_rect = pygame.Rect(SCREEN_WIDTH//4 - 40, 120 + i*40 - 5, SCREEN_WIDTH//2 + 100, 40)
-                    pygame.draw.rect(screen, BLUE, highlight_rect, 2)
+                    screen.rect(BLUE, highlight_rect, 2)
 
         # Update the display
-        pygame.display.flip()
+        screen.present()
+        frame_skip.end_frame()
 
-        # Cap the frame rate
-        clock.tick(FPS)
+        # Cap the render rate, running pending I/O until the next frame is due
+        await pacer.wait()
 
+    if submit_task is not None:
+        submit_task.cancel()
+    if leaderboard is not None:
+        leaderboard.close()
+    recorder.close(score)
+
+def main():
+    asyncio.run(run_game())
     pygame.quit()
     sys.exit()
 
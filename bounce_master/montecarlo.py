@@ -0,0 +1,327 @@
+"""Monte Carlo score distribution for a difficulty setting.
+
+Plays a large number of seeded headless games with the batched simulator
+across a process pool and reports score percentiles and how long games
+survive. Every worker returns fixed-size histograms for its chunk of games
+and the parent merges them as they arrive, so memory stays constant no
+matter how many games are played.
+
+    python montecarlo.py --games 1000000 --policy tracking
+    python montecarlo.py --games 200000 --obstacle-spawn-delay 90 --output hard.json
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from simulator import VectorEnv, tracking_policy, NOOP, RIGHT
+
+FPS = 60
+
+
+def idle_policy(obs, rng):
+    """Never move the paddle"""
+    return np.full(len(obs), NOOP)
+
+
+def random_policy(obs, rng):
+    """Press a random key every frame"""
+    return rng.integers(NOOP, RIGHT + 1, size=len(obs))
+
+
+POLICIES = {
+    "tracking": lambda obs, rng: tracking_policy(obs),
+    "idle": idle_policy,
+    "random": random_policy,
+}
+
+
+def load_policy(name):
+    """Look up a built-in policy or import one given as "module:function".
+
+    Custom policies are called as policy(observations, rng) and must return
+    one action (NOOP/LEFT/RIGHT) per row.
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    if ":" not in name:
+        raise ValueError(f"Unknown policy {name!r}; use one of {sorted(POLICIES)} "
+                         f"or module:function")
+    module_name, function_name = name.split(":", 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+class Histogram:
+    """Fixed-width histogram with an overflow bin and exact moments"""
+
+    def __init__(self, bin_width, limit):
+        self.bin_width = bin_width
+        self.limit = limit
+        # One extra bin collects everything at or above the limit
+        self.counts = np.zeros(int(np.ceil(limit / bin_width)) + 1, dtype=np.int64)
+        self.total = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, values):
+        values = np.asarray(values)
+        if len(values) == 0:
+            return
+        bins = np.minimum(values // self.bin_width, len(self.counts) - 1).astype(np.int64)
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.total += len(values)
+        self.sum += float(values.sum())
+        self.sum_squares += float((values.astype(np.float64) ** 2).sum())
+        low, high = values.min().item(), values.max().item()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.total += other.total
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def std(self):
+        if not self.total:
+            return 0.0
+        return max(0.0, self.sum_squares / self.total - self.mean() ** 2) ** 0.5
+
+    def percentile(self, q):
+        """Start of the bin holding the q-th percentile (0-100).
+
+        Exact when every sample is a multiple of the bin width, as scores
+        are with the default bin of 5.
+        """
+        if not self.total:
+            return 0
+        rank = int(np.searchsorted(np.cumsum(self.counts), q / 100 * self.total, side="left"))
+        if rank >= len(self.counts) - 1:
+            return self.max
+        return max(rank * self.bin_width, self.min)
+
+    def survival(self, value):
+        """Fraction of samples at or above value.
+
+        Counted from the start of the bin containing value, so exact when
+        value is a multiple of the bin width. Game lengths cut off at the
+        limit are in the bin at the limit and count as still running there.
+        """
+        if not self.total:
+            return 0.0
+        bin_index = min(int(value // self.bin_width), len(self.counts) - 1)
+        return float(self.counts[bin_index:].sum() / self.total)
+
+
+class Results:
+    """Aggregated outcome of a batch of games"""
+
+    def __init__(self, score_bin, max_score, frame_bin, max_frames):
+        self.scores = Histogram(score_bin, max_score)
+        self.frames = Histogram(frame_bin, max_frames)
+        self.truncated = 0
+
+    def merge(self, other):
+        self.scores.merge(other.scores)
+        self.frames.merge(other.frames)
+        self.truncated += other.truncated
+
+
+def run_chunk(task):
+    """Play task["games"] games and return their histograms.
+
+    Environments stop counting once the chunk's quota of games has been
+    started, but games already in flight are always played to the end, so
+    long games are not under-represented in the sample.
+    """
+    games = task["games"]
+    env_seed, policy_seed = task["seed"].spawn(2)
+    batch_size = min(task["batch_size"], games)
+    env = VectorEnv(batch_size, seed=env_seed.generate_state(1)[0],
+                    max_frames=task["max_frames"], **task["difficulty"])
+    policy = load_policy(task["policy"])
+    policy_rng = np.random.default_rng(policy_seed)
+    results = Results(task["score_bin"], task["max_score"],
+                      task["frame_bin"], task["max_frames"])
+
+    obs = env.reset()
+    counting = np.ones(batch_size, dtype=bool)
+    started = batch_size
+    while counting.any():
+        obs, rewards, dones, info = env.step(policy(obs, policy_rng))
+        finished = dones & counting
+        if not finished.any():
+            continue
+        results.scores.add(info["score"][finished])
+        results.frames.add(info["frames"][finished])
+        results.truncated += int(info["truncated"][finished].sum())
+        # Finished environments either start a counted game or retire
+        for i in np.flatnonzero(finished):
+            if started < games:
+                started += 1
+            else:
+                counting[i] = False
+    return results
+
+
+def split_games(games, chunk_size):
+    while games > 0:
+        yield min(chunk_size, games)
+        games -= chunk_size
+
+
+def run(args):
+    difficulty = {
+        "obstacle_spawn_delay": args.obstacle_spawn_delay,
+        "min_obstacle_spawn_delay": args.min_obstacle_spawn_delay,
+        "obstacle_delay_step": args.obstacle_delay_step,
+        "obstacle_speedup": args.obstacle_speedup,
+        "power_up_spawn_delay": args.power_up_spawn_delay,
+        "gravity": args.gravity,
+    }
+    # Chunk seeds depend only on --seed and the chunk index, so the merged
+    # result is the same for any number of workers
+    chunk_seeds = np.random.SeedSequence(args.seed).spawn(
+        -(-args.games // args.chunk_size))
+    tasks = [{
+        "games": games,
+        "seed": chunk_seed,
+        "batch_size": args.batch_size,
+        "policy": args.policy,
+        "difficulty": difficulty,
+        "max_frames": args.max_frames,
+        "score_bin": args.score_bin,
+        "max_score": args.max_score,
+        "frame_bin": FPS,
+    } for games, chunk_seed in zip(split_games(args.games, args.chunk_size), chunk_seeds)]
+
+    load_policy(args.policy)  # Fail fast on a bad policy name
+    total = Results(args.score_bin, args.max_score, FPS, args.max_frames)
+    start_time = time.perf_counter()
+    with multiprocessing.Pool(args.workers) as pool:
+        for results in pool.imap_unordered(run_chunk, tasks):
+            total.merge(results)
+            elapsed = time.perf_counter() - start_time
+            print(f"\r{total.scores.total:,}/{args.games:,} games "
+                  f"({total.scores.total / elapsed:,.0f} games/s)",
+                  end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return total, time.perf_counter() - start_time
+
+
+def report(total, args, elapsed):
+    scores, frames = total.scores, total.frames
+    print(f"Games played:   {scores.total:,} in {elapsed:.1f}s")
+    print(f"Policy:         {args.policy}")
+    if total.truncated:
+        print(f"Truncated:      {total.truncated:,} games reached --max-frames")
+    print(f"Score mean/std: {scores.mean():.1f} / {scores.std():.1f} "
+          f"(min {scores.min}, max {scores.max})")
+    print("Score percentiles:")
+    for q in args.percentiles:
+        print(f"  p{q:<5g} {scores.percentile(q):>8}")
+    print(f"Game length mean: {frames.mean() / FPS:.1f}s")
+    print("Still playing after:")
+    for seconds in args.survival_points:
+        print(f"  {seconds:>5}s  {frames.survival(seconds * FPS) * 100:6.2f}%")
+
+
+def write_output(total, args, elapsed, path):
+    scores, frames = total.scores, total.frames
+    summary = {
+        "games": scores.total,
+        "elapsed_seconds": elapsed,
+        "policy": args.policy,
+        "seed": args.seed,
+        "difficulty": {
+            "obstacle_spawn_delay": args.obstacle_spawn_delay,
+            "min_obstacle_spawn_delay": args.min_obstacle_spawn_delay,
+            "obstacle_delay_step": args.obstacle_delay_step,
+            "obstacle_speedup": args.obstacle_speedup,
+            "power_up_spawn_delay": args.power_up_spawn_delay,
+            "gravity": args.gravity,
+        },
+        "truncated": total.truncated,
+        "score": {
+            "mean": scores.mean(),
+            "std": scores.std(),
+            "min": scores.min,
+            "max": scores.max,
+            "percentiles": {str(q): scores.percentile(q) for q in args.percentiles},
+            "bin_width": scores.bin_width,
+            "histogram": scores.counts.tolist(),
+        },
+        "game_over": {
+            "bin_width_frames": frames.bin_width,
+            "histogram": frames.counts.tolist(),
+            # survival[t] = fraction of games that lasted at least t seconds;
+            # games cut off by --max-frames count as running at the cut-off
+            "survival": [frames.survival(t * FPS) for t in range(len(frames.counts))],
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(summary, f, indent=2)
+    print(f"Wrote {path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo score distribution for Bounce Master")
+    parser.add_argument("--games", type=int, default=100000, help="Number of games to play")
+    parser.add_argument("--policy", default="tracking",
+                        help=f"One of {sorted(POLICIES)} or module:function")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=2048,
+                        help="Games simulated in lockstep per worker")
+    parser.add_argument("--chunk-size", type=int, default=20000,
+                        help="Games per task handed to a worker")
+    parser.add_argument("--max-frames", type=int, default=FPS * 60 * 10,
+                        help="Cut games off after this many frames (default: 10 minutes)")
+
+    difficulty = parser.add_argument_group("difficulty")
+    difficulty.add_argument("--obstacle-spawn-delay", type=int, default=120)
+    difficulty.add_argument("--min-obstacle-spawn-delay", type=int, default=60)
+    difficulty.add_argument("--obstacle-delay-step", type=int, default=100,
+                            help="Score needed to spawn obstacles one frame sooner")
+    difficulty.add_argument("--obstacle-speedup", type=float, default=1.1)
+    difficulty.add_argument("--power-up-spawn-delay", type=int, default=300)
+    difficulty.add_argument("--gravity", type=float, default=0.2)
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--score-bin", type=int, default=5, help="Score histogram bin width")
+    output.add_argument("--max-score", type=int, default=100000,
+                        help="Scores above this share one overflow bin")
+    output.add_argument("--percentiles", type=float, nargs="+",
+                        default=[1, 5, 10, 25, 50, 75, 90, 95, 99, 99.9])
+    output.add_argument("--survival-points", type=int, nargs="+",
+                        default=[5, 10, 15, 30, 60, 120, 300],
+                        help="Seconds at which to report the share of games still running")
+    output.add_argument("--output", help="Write the full histograms to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    total, elapsed = run(args)
+    report(total, args, elapsed)
+    if args.output:
+        write_output(total, args, elapsed, args.output)
+
+
+if __name__ == "__main__":
+    main()
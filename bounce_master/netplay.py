@@ -0,0 +1,606 @@
+"""Networking for the two-player versus mode.
+
+The host runs the only authoritative copy of the arena and sends snapshots
+of every entity to the client at a fixed tick rate over UDP. Snapshots are
+delta-compressed against the newest snapshot the client has acknowledged:
+entities that did not change are left out entirely and changed entities
+only carry the fields that differ. The client interpolates between the
+snapshots it receives and predicts its own paddle from local input so the
+paddle responds immediately.
+
+Nothing in this module depends on pygame. The arena itself lives in
+versus.py; here an arena state is just a dict mapping an entity id to a
+record (kind, x, y, a, b, style) of small integers, see encode_record().
+"""
+import random
+import socket
+import struct
+import time
+from collections import deque
+
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 47800
+TICK_RATE = 60          # Simulation ticks per second on the host
+SNAPSHOT_INTERVAL = 2   # Send a snapshot every N ticks (30 Hz)
+INTERPOLATION_DELAY = 3 * SNAPSHOT_INTERVAL  # Ticks the client renders behind the host
+
+# Message types
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+
+# Entity kinds
+PADDLE = 0
+BALL = 1
+OBSTACLE = 2
+POWER_UP = 3
+
+# Positions are sent in quarter pixels
+POSITION_SCALE = 4
+RECORD_FIELDS = 6  # kind, x, y, a, b, style
+INT16_MIN, INT16_MAX = -32768, 32767
+
+HISTORY_TICKS = 2 * TICK_RATE  # How far back the host can delta against
+REDUNDANT_INPUTS = 4            # Inputs repeated in every INPUT packet
+MAX_PACKET_SIZE = 1200
+
+_header = struct.Struct("!B")
+_welcome = struct.Struct("!BBB")
+_input_header = struct.Struct("!BIIB")
+_snapshot_header = struct.Struct("!BIIIiiBHH")
+_entity_header = struct.Struct("!HB")
+_field = struct.Struct("!h")
+_entity_id = struct.Struct("!H")
+
+
+def _clamp16(value):
+    return max(INT16_MIN, min(INT16_MAX, int(round(value))))
+
+
+def encode_record(kind, x, y, a=0, b=0, style=0):
+    """Pack an entity into the integer record used on the wire.
+
+    x and y are pixel positions (quantized to POSITION_SCALE); the meaning
+    of a and b depends on the kind (paddle: width and speed, ball: radius,
+    obstacle: width and height, power-up: radius and type) and style is a
+    palette index for the color.
+    """
+    return (kind, _clamp16(x * POSITION_SCALE), _clamp16(y * POSITION_SCALE),
+            _clamp16(a), _clamp16(b), _clamp16(style))
+
+
+def record_position(record):
+    """Pixel position of a record"""
+    return record[1] / POSITION_SCALE, record[2] / POSITION_SCALE
+
+
+# ---------------------------------------------------------------------------
+# Messages
+
+def encode_hello():
+    return _welcome.pack(HELLO, PROTOCOL_VERSION, 0)
+
+
+def encode_welcome(player_index):
+    return _welcome.pack(WELCOME, PROTOCOL_VERSION, player_index)
+
+
+def encode_input(ack_tick, seq, directions):
+    """Client input: the newest len(directions) inputs ending at seq.
+
+    directions are -1, 0 or 1, oldest first. Sending a few past inputs in
+    every packet lets the host recover from a lost packet without a resend.
+    """
+    data = _input_header.pack(INPUT, ack_tick, seq, len(directions))
+    return data + bytes(d & 0xFF for d in directions)
+
+
+def decode_input(data):
+    _, ack_tick, seq, count = _input_header.unpack_from(data)
+    raw = data[_input_header.size:_input_header.size + count]
+    directions = [d - 256 if d > 127 else d for d in raw]
+    return ack_tick, seq, directions
+
+
+def encode_snapshot(tick, state, baseline_tick=0, baseline=None,
+                    input_ack=0, scores=(0, 0), status=0):
+    """Encode state as a delta against baseline (a full snapshot if None).
+
+    Each entity that differs from the baseline is written as its id, a
+    bitmask of the changed fields and those fields only; entities missing
+    from state are listed as removed.
+    """
+    if baseline is None:
+        baseline_tick, baseline = 0, {}
+    changed = []
+    for entity_id, record in state.items():
+        old = baseline.get(entity_id)
+        if old is None:
+            mask = (1 << RECORD_FIELDS) - 1
+        else:
+            mask = 0
+            for i in range(RECORD_FIELDS):
+                if record[i] != old[i]:
+                    mask |= 1 << i
+            if not mask:
+                continue
+        fields = [record[i] for i in range(RECORD_FIELDS) if mask & (1 << i)]
+        changed.append(_entity_header.pack(entity_id, mask) +
+                       b"".join(_field.pack(value) for value in fields))
+    removed = [_entity_id.pack(entity_id) for entity_id in baseline if entity_id not in state]
+    header = _snapshot_header.pack(SNAPSHOT, tick, baseline_tick, input_ack,
+                                   scores[0], scores[1], status, len(changed), len(removed))
+    return header + b"".join(changed) + b"".join(removed)
+
+
+def decode_snapshot(data, baselines):
+    """Decode a snapshot, rebuilding the full state from its baseline.
+
+    baselines maps tick -> state of snapshots already decoded. Returns
+    (header, state) or (header, None) when the baseline is no longer known.
+    """
+    (_, tick, baseline_tick, input_ack, score0, score1, status,
+     changed_count, removed_count) = _snapshot_header.unpack_from(data)
+    header = {
+        "tick": tick,
+        "baseline_tick": baseline_tick,
+        "input_ack": input_ack,
+        "scores": (score0, score1),
+        "status": status,
+    }
+    if baseline_tick:
+        baseline = baselines.get(baseline_tick)
+        if baseline is None:
+            return header, None
+    else:
+        baseline = {}
+
+    state = dict(baseline)
+    offset = _snapshot_header.size
+    for _ in range(changed_count):
+        entity_id, mask = _entity_header.unpack_from(data, offset)
+        offset += _entity_header.size
+        record = list(baseline.get(entity_id, (0,) * RECORD_FIELDS))
+        for i in range(RECORD_FIELDS):
+            if mask & (1 << i):
+                record[i] = _field.unpack_from(data, offset)[0]
+                offset += _field.size
+        state[entity_id] = tuple(record)
+    for _ in range(removed_count):
+        state.pop(_entity_id.unpack_from(data, offset)[0], None)
+        offset += _entity_id.size
+    return header, state
+
+
+def message_type(data):
+    return _header.unpack_from(data)[0] if data else None
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+
+class NetStats:
+    """Traffic and latency counters for one end of a connection"""
+
+    def __init__(self, window=TICK_RATE):
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.full_snapshots = 0
+        self.delta_snapshots = 0
+        self.rtt = None       # Smoothed round-trip time in seconds
+        self.last_rtt = None
+        self.snapshots_expected = 0
+        self.snapshots_received = 0
+        self._tick_bytes = deque(maxlen=window)
+        self._current_tick_bytes = 0
+
+    def record_send(self, size):
+        self.bytes_sent += size
+        self.packets_sent += 1
+        self._current_tick_bytes += size
+
+    def record_receive(self, size):
+        self.bytes_received += size
+        self.packets_received += 1
+
+    def record_rtt(self, sample):
+        self.last_rtt = sample
+        self.rtt = sample if self.rtt is None else self.rtt * 0.9 + sample * 0.1
+
+    def end_tick(self):
+        """Close the current simulation tick for the bytes-per-tick metric"""
+        self._tick_bytes.append(self._current_tick_bytes)
+        self._current_tick_bytes = 0
+
+    def bytes_per_tick(self):
+        """Average bytes sent per tick over the recent window"""
+        if not self._tick_bytes:
+            return 0.0
+        return sum(self._tick_bytes) / len(self._tick_bytes)
+
+    def loss(self):
+        """Fraction of snapshots that never arrived (client side)"""
+        if not self.snapshots_expected:
+            return 0.0
+        return max(0.0, 1 - self.snapshots_received / self.snapshots_expected)
+
+    def summary(self):
+        return {
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "packets_sent": self.packets_sent,
+            "packets_received": self.packets_received,
+            "bytes_per_tick": round(self.bytes_per_tick(), 1),
+            "full_snapshots": self.full_snapshots,
+            "delta_snapshots": self.delta_snapshots,
+            "rtt_ms": None if self.rtt is None else round(self.rtt * 1000, 1),
+            "snapshot_loss": round(self.loss(), 3),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Transports
+
+class UdpTransport:
+    """Non-blocking UDP socket"""
+
+    def __init__(self, host="0.0.0.0", port=0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind((host, port))
+        self.address = self.sock.getsockname()
+
+    def send(self, data, address):
+        try:
+            self.sock.sendto(data, address)
+        except OSError as e:
+            # A full send buffer or an unreachable peer is just packet loss
+            print(f"Error sending packet: {e}")
+
+    def receive(self):
+        packets = []
+        while True:
+            try:
+                data, address = self.sock.recvfrom(MAX_PACKET_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return packets
+            except ConnectionResetError:
+                # Windows reports ICMP port unreachable on the next recvfrom
+                continue
+            packets.append((data, address))
+
+    def close(self):
+        self.sock.close()
+
+
+class LoopbackNetwork:
+    """In-process network that simulates latency, jitter and packet loss.
+
+    Packets are delivered to endpoints created with endpoint() once their
+    delivery time has passed. clock defaults to time.monotonic but a test
+    harness can pass its own simulated clock.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=None, clock=time.monotonic):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.endpoints = {}
+        self.dropped = 0
+
+    def endpoint(self, address):
+        endpoint = LoopbackEndpoint(self, address)
+        self.endpoints[address] = endpoint
+        return endpoint
+
+    def deliver(self, data, source, destination):
+        if self.random.random() < self.loss:
+            self.dropped += 1
+            return
+        endpoint = self.endpoints.get(destination)
+        if endpoint is None:
+            return
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        endpoint.inbox.append((self.clock() + delay, data, source))
+
+
+class LoopbackEndpoint:
+    def __init__(self, network, address):
+        self.network = network
+        self.address = address
+        self.inbox = []
+
+    def send(self, data, address):
+        self.network.deliver(bytes(data), self.address, address)
+
+    def receive(self):
+        now = self.network.clock()
+        due = sorted((p for p in self.inbox if p[0] <= now), key=lambda p: p[0])
+        self.inbox = [p for p in self.inbox if p[0] > now]
+        return [(data, source) for _, data, source in due]
+
+    def close(self):
+        self.network.endpoints.pop(self.address, None)
+
+
+# ---------------------------------------------------------------------------
+# Host
+
+class HostSession:
+    """Authoritative side: accepts one client, queues its input and sends snapshots"""
+
+    def __init__(self, transport, snapshot_interval=SNAPSHOT_INTERVAL, clock=time.monotonic):
+        self.transport = transport
+        self.snapshot_interval = snapshot_interval
+        self.clock = clock
+        self.stats = NetStats()
+        self.client = None
+        self.client_acked_tick = 0
+        self.input_seq = 0          # Newest input received
+        self.processed_seq = 0      # Newest input applied to the arena
+        self.inputs = {}            # seq -> direction
+        self.last_direction = 0
+        self.history = {}           # tick -> state sent in that snapshot
+
+    @property
+    def connected(self):
+        return self.client is not None
+
+    def poll(self):
+        """Handle every packet that has arrived"""
+        for data, address in self.transport.receive():
+            self.stats.record_receive(len(data))
+            kind = message_type(data)
+            if kind == HELLO:
+                if self.client is None or self.client == address:
+                    self.client = address
+                    self._send(encode_welcome(1))
+            elif kind == INPUT and address == self.client:
+                ack_tick, seq, directions = decode_input(data)
+                if ack_tick in self.history and ack_tick > self.client_acked_tick:
+                    self.client_acked_tick = ack_tick
+                first = seq - len(directions) + 1
+                for offset, direction in enumerate(directions):
+                    if first + offset > self.processed_seq:
+                        self.inputs[first + offset] = direction
+                self.input_seq = max(self.input_seq, seq)
+
+    def next_input(self):
+        """Direction of the client's paddle for the next simulation tick.
+
+        Inputs are applied one per tick in sequence order, which is exactly
+        what the client's prediction assumes. If the client's next input has
+        not arrived yet the previous direction is repeated; if inputs pile up
+        (e.g. after a latency spike) the oldest ones are skipped.
+        """
+        backlog = self.input_seq - self.processed_seq
+        if backlog > REDUNDANT_INPUTS * 2:
+            for seq in range(self.processed_seq + 1, self.input_seq - REDUNDANT_INPUTS + 1):
+                self.inputs.pop(seq, None)
+            self.processed_seq = self.input_seq - REDUNDANT_INPUTS
+        direction = self.inputs.pop(self.processed_seq + 1, None)
+        if direction is not None:
+            self.processed_seq += 1
+            self.last_direction = direction
+        return self.last_direction
+
+    def end_tick(self, tick, state, scores, status=0):
+        """Finish simulation tick; sends a snapshot every snapshot_interval ticks"""
+        if self.client is not None and tick % self.snapshot_interval == 0:
+            baseline = self.history.get(self.client_acked_tick)
+            if baseline is None:
+                data = encode_snapshot(tick, state, input_ack=self.processed_seq,
+                                       scores=scores, status=status)
+                self.stats.full_snapshots += 1
+            else:
+                data = encode_snapshot(tick, state, self.client_acked_tick, baseline,
+                                       self.processed_seq, scores, status)
+                self.stats.delta_snapshots += 1
+            self._send(data)
+            self.history[tick] = state
+            for old_tick in [t for t in self.history if t <= tick - HISTORY_TICKS]:
+                del self.history[old_tick]
+        self.stats.end_tick()
+
+    def _send(self, data):
+        self.stats.record_send(len(data))
+        self.transport.send(data, self.client)
+
+
+# ---------------------------------------------------------------------------
+# Client
+
+class SnapshotBuffer:
+    """Recent snapshots, sampled between two of them for smooth rendering"""
+
+    def __init__(self, delay=INTERPOLATION_DELAY, size=32):
+        self.delay = delay
+        self.snapshots = deque(maxlen=size)  # (tick, state), oldest first
+        self.render_tick = None
+
+    @property
+    def latest_tick(self):
+        return self.snapshots[-1][0] if self.snapshots else 0
+
+    def add(self, tick, state):
+        if self.snapshots and tick <= self.latest_tick:
+            return  # Out of order; the newer one already covers it
+        self.snapshots.append((tick, state))
+
+    def advance(self, ticks):
+        """Move the render clock forward, steering it towards latest - delay"""
+        if not self.snapshots:
+            return
+        target = self.latest_tick - self.delay
+        if self.render_tick is None or abs(target - self.render_tick) > self.delay * 2:
+            self.render_tick = target
+        else:
+            self.render_tick += ticks + (target - self.render_tick) * 0.05
+
+    def sample(self):
+        """State at the render tick with positions interpolated"""
+        if not self.snapshots:
+            return {}
+        t = self.render_tick if self.render_tick is not None else self.latest_tick
+        older = newer = None
+        for tick, state in self.snapshots:
+            if tick <= t:
+                older = (tick, state)
+            else:
+                newer = (tick, state)
+                break
+        if older is None:
+            return dict(newer[1])
+        if newer is None:
+            return dict(older[1])
+
+        alpha = (t - older[0]) / (newer[0] - older[0])
+        result = {}
+        for entity_id, record in newer[1].items():
+            old = older[1].get(entity_id)
+            if old is None or old[0] != record[0]:
+                result[entity_id] = record
+            else:
+                result[entity_id] = (record[0],
+                                     old[1] + (record[1] - old[1]) * alpha,
+                                     old[2] + (record[2] - old[2]) * alpha) + record[3:]
+        return result
+
+
+class PaddlePredictor:
+    """Client-side prediction of the local paddle.
+
+    move(x, width, speed, direction) must apply exactly the host's paddle
+    rule for one tick. Inputs are applied immediately and remembered until
+    the host confirms them; every snapshot resets the paddle to the host's
+    position and replays the inputs the host has not processed yet.
+    """
+
+    def __init__(self, move):
+        self.move = move
+        self.x = None
+        self.width = 0
+        self.speed = 0
+        self.pending = deque()  # (seq, direction)
+
+    def apply(self, seq, direction):
+        self.pending.append((seq, direction))
+        if self.x is not None:
+            self.x = self.move(self.x, self.width, self.speed, direction)
+
+    def reconcile(self, record, input_ack):
+        while self.pending and self.pending[0][0] <= input_ack:
+            self.pending.popleft()
+        self.x = record_position(record)[0]
+        self.width, self.speed = record[3], record[4]
+        for _, direction in self.pending:
+            self.x = self.move(self.x, self.width, self.speed, direction)
+
+
+class ClientSession:
+    """Joins a host, sends input every tick and keeps the snapshot buffer"""
+
+    def __init__(self, transport, host_address, move, clock=time.monotonic):
+        self.transport = transport
+        self.host = host_address
+        self.clock = clock
+        self.stats = NetStats()
+        self.player_index = None
+        self.seq = 0
+        self.recent_inputs = deque(maxlen=REDUNDANT_INPUTS)
+        self.sent_at = {}       # seq -> send time, for RTT
+        self.baselines = {}     # tick -> decoded state
+        self.acked_tick = 0
+        self.first_tick = None
+        self.scores = (0, 0)
+        self.status = 0
+        self.buffer = SnapshotBuffer()
+        self.predictor = PaddlePredictor(move)
+        self._last_hello = None
+
+    @property
+    def connected(self):
+        return self.player_index is not None
+
+    def poll(self):
+        """Handle every packet that has arrived; keeps saying hello until welcomed"""
+        if not self.connected:
+            now = self.clock()
+            if self._last_hello is None or now - self._last_hello > 0.25:
+                self._send(encode_hello())
+                self._last_hello = now
+
+        for data, address in self.transport.receive():
+            if address != self.host:
+                continue
+            self.stats.record_receive(len(data))
+            kind = message_type(data)
+            if kind == WELCOME:
+                self.player_index = _welcome.unpack_from(data)[2]
+            elif kind == SNAPSHOT:
+                self._receive_snapshot(data)
+
+    def _receive_snapshot(self, data):
+        header, state = decode_snapshot(data, self.baselines)
+        if state is None:
+            return  # Baseline already forgotten; the next snapshot will do
+        tick = header["tick"]
+        if tick <= self.buffer.latest_tick:
+            return
+        if self.first_tick is None:
+            self.first_tick = tick
+        self.stats.snapshots_received += 1
+        self.stats.snapshots_expected = (tick - self.first_tick) // SNAPSHOT_INTERVAL + 1
+        if header["baseline_tick"]:
+            self.stats.delta_snapshots += 1
+        else:
+            self.stats.full_snapshots += 1
+
+        self.baselines[tick] = state
+        for old_tick in [t for t in self.baselines if t <= tick - HISTORY_TICKS]:
+            del self.baselines[old_tick]
+        self.acked_tick = tick
+        self.scores = header["scores"]
+        self.status = header["status"]
+        self.buffer.add(tick, state)
+
+        input_ack = header["input_ack"]
+        sent_at = self.sent_at.pop(input_ack, None)
+        if sent_at is not None:
+            self.stats.record_rtt(self.clock() - sent_at)
+        for seq in [s for s in self.sent_at if s < input_ack]:
+            del self.sent_at[seq]
+        if self.player_index is not None and self.player_index in state:
+            self.predictor.reconcile(state[self.player_index], input_ack)
+
+    def send_input(self, direction):
+        """Apply direction to the predicted paddle and send it to the host"""
+        if not self.connected:
+            return
+        self.seq += 1
+        self.recent_inputs.append(direction)
+        self.sent_at[self.seq] = self.clock()
+        self.predictor.apply(self.seq, direction)
+        self._send(encode_input(self.acked_tick, self.seq, list(self.recent_inputs)))
+
+    def end_tick(self, ticks=1):
+        self.buffer.advance(ticks)
+        self.stats.end_tick()
+
+    def view(self):
+        """Interpolated arena state with the local paddle at its predicted position"""
+        state = self.buffer.sample()
+        own = state.get(self.player_index)
+        if own is not None and self.predictor.x is not None:
+            state[self.player_index] = (own[0], self.predictor.x * POSITION_SCALE, own[2],
+                                        self.predictor.width, own[4], own[5])
+        return state
+
+    def _send(self, data):
+        self.stats.record_send(len(data))
+        self.transport.send(data, self.host)
@@ -0,0 +1,203 @@
+"""Render backends.
+
+The game always draws in logical SCREEN_WIDTH x SCREEN_HEIGHT coordinates.
+The backend maps them onto the real window, which can be any size:
+
+- TextureRenderer uses pygame._sdl2.video. Rectangles are filled by the GPU,
+  circles and text are cached as textures, and the renderer scales the
+  logical canvas to the window (letterboxed), so a 1080p or 4K display costs
+  about the same as 800x600.
+- SurfaceRenderer is the original software path: pygame.draw onto a Surface.
+  If the window is bigger than the logical size it draws to an offscreen
+  surface and scales it up every frame, which is slow but always works.
+
+Both expose the same small drawing API (fill, rect, circle, render_text,
+blit, present) and snapshot() for reading the last frame back, e.g. in a
+headless test with SDL_VIDEODRIVER=dummy and the software renderer.
+"""
+import os
+from collections import OrderedDict
+
+import pygame
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:
+    Window = Renderer = Texture = None
+
+TEXT_CACHE_SIZE = 256
+
+
+def parse_size(value):
+    """Parse "1920x1080" into (1920, 1080)"""
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+class SurfaceRenderer:
+    """Software rendering with pygame.draw, scaled up on present if needed"""
+
+    def __init__(self, logical_size, caption, display_size=None, fullscreen=False):
+        self.logical_size = logical_size
+        flags = pygame.FULLSCREEN if fullscreen else 0
+        self.window = pygame.display.set_mode(display_size or logical_size, flags)
+        pygame.display.set_caption(caption)
+        if self.window.get_size() == tuple(logical_size):
+            self.surface = self.window
+        else:
+            self.surface = pygame.Surface(logical_size)
+
+    def fill(self, color):
+        self.surface.fill(color)
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.surface, color, rect, width)
+
+    def circle(self, color, center, radius):
+        pygame.draw.circle(self.surface, color, center, radius)
+
+    def render_text(self, font, text, color):
+        return font.render(text, True, color)
+
+    def blit(self, image, position):
+        self.surface.blit(image, position)
+
+    def present(self):
+        if self.surface is not self.window:
+            self.window.fill((0, 0, 0))
+            area = _letterbox(self.logical_size, self.window.get_size())
+            pygame.transform.scale(self.surface, area.size,
+                                   self.window.subsurface(area))
+        pygame.display.flip()
+
+    def snapshot(self):
+        """Copy of the last frame at window resolution"""
+        return self.window.copy()
+
+
+class TextImage:
+    """Cached text texture; has the get_width/get_height of a Surface.
+
+    texture is None for empty text: SDL cannot create a 0 px wide texture,
+    and there is nothing to draw anyway.
+    """
+
+    def __init__(self, texture, size=None):
+        self.texture = texture
+        self.size = size or (texture.width, texture.height)
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+
+def _text_image(renderer, surface):
+    if surface.get_width() == 0 or surface.get_height() == 0:
+        return TextImage(None, surface.get_size())
+    return TextImage(Texture.from_surface(renderer, surface))
+
+
+class TextureRenderer:
+    """GPU rendering through pygame._sdl2.video with renderer-side scaling"""
+
+    def __init__(self, logical_size, caption, display_size=None, fullscreen=False,
+                 software=False):
+        if Renderer is None:
+            raise RuntimeError("pygame._sdl2.video is not available")
+        self.logical_size = logical_size
+        if fullscreen:
+            self.window = Window(caption, fullscreen_desktop=True)
+        else:
+            self.window = Window(caption, size=display_size or logical_size)
+        self.renderer = Renderer(self.window, accelerated=0 if software else -1)
+        # SDL scales the logical canvas to the window and letterboxes it
+        self.renderer.logical_size = logical_size
+        self._circles = {}
+        self._texts = OrderedDict()
+
+    def fill(self, color):
+        self.renderer.draw_color = pygame.Color(color)
+        self.renderer.clear()
+
+    def rect(self, color, rect, width=0):
+        self.renderer.draw_color = pygame.Color(color)
+        rect = pygame.Rect(rect)
+        if width == 0:
+            self.renderer.fill_rect(rect)
+        else:
+            # Outline drawn inwards, like pygame.draw.rect
+            for _ in range(width):
+                self.renderer.draw_rect(rect)
+                rect = rect.inflate(-2, -2)
+
+    def circle(self, color, center, radius):
+        texture = self._circles.get((radius, color))
+        if texture is None:
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            texture = Texture.from_surface(self.renderer, surface)
+            self._circles[(radius, color)] = texture
+        texture.draw(dstrect=(center[0] - radius, center[1] - radius,
+                              radius * 2, radius * 2))
+
+    def render_text(self, font, text, color):
+        # The HUD redraws the same strings every frame; keep recent ones
+        key = (id(font), text, color)
+        image = self._texts.get(key)
+        if image is None:
+            image = _text_image(self.renderer, font.render(text, True, color))
+            self._texts[key] = image
+            if len(self._texts) > TEXT_CACHE_SIZE:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(key)
+        return image
+
+    def blit(self, image, position):
+        if isinstance(image, pygame.Surface):
+            image = _text_image(self.renderer, image)
+        if image.texture is None:
+            return
+        image.texture.draw(dstrect=(position[0], position[1],
+                                    image.get_width(), image.get_height()))
+
+    def present(self):
+        self.renderer.present()
+
+    def snapshot(self):
+        """Copy of the current frame at window resolution"""
+        return self.renderer.to_surface(pygame.Surface(self.window.size, 0, 32))
+
+
+def _letterbox(logical_size, window_size):
+    """Largest rect with the logical aspect ratio centred in the window"""
+    scale = min(window_size[0] / logical_size[0], window_size[1] / logical_size[1])
+    width, height = int(logical_size[0] * scale), int(logical_size[1] * scale)
+    return pygame.Rect((window_size[0] - width) // 2, (window_size[1] - height) // 2,
+                       width, height)
+
+
+def create_renderer(logical_size, caption, backend=None, display_size=None,
+                    fullscreen=None):
+    """Create the configured backend, falling back to SurfaceRenderer.
+
+    backend is "texture", "software-texture" (SDL's software renderer, for
+    headless runs), "surface" or "auto" (texture, else surface). Defaults
+    come from the BOUNCE_RENDERER, BOUNCE_DISPLAY_SIZE (e.g. "1920x1080")
+    and BOUNCE_FULLSCREEN environment variables.
+    """
+    backend = backend or os.environ.get('BOUNCE_RENDERER', 'auto')
+    if display_size is None and os.environ.get('BOUNCE_DISPLAY_SIZE'):
+        display_size = parse_size(os.environ['BOUNCE_DISPLAY_SIZE'])
+    if fullscreen is None:
+        fullscreen = os.environ.get('BOUNCE_FULLSCREEN', '') not in ('', '0')
+
+    if backend in ('auto', 'texture', 'software-texture'):
+        try:
+            return TextureRenderer(logical_size, caption, display_size, fullscreen,
+                                   software=backend == 'software-texture')
+        except Exception as e:
+            print(f"Texture renderer unavailable, using the surface renderer: {e}")
+    return SurfaceRenderer(logical_size, caption, display_size, fullscreen)
@@ -0,0 +1,457 @@
+"""Headless, batched Bounce Master simulator for bots and difficulty tuning.
+
+VectorEnv steps B independent games in lockstep. Every rule mirrors the
+Player, Ball, Obstacle and PowerUp classes in main.py, but the entity state
+lives in fixed-size numpy arrays (one row per game) so a whole batch is
+advanced with a handful of array operations instead of a Python loop per
+entity. Nothing here imports pygame, so it runs without a display.
+
+    env = VectorEnv(1024, seed=0)
+    obs = env.reset()
+    while True:
+        obs, reward, done, info = env.step(actions)
+"""
+import numpy as np
+
+# Arena and entity constants, kept in sync with main.py
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+PADDLE_WIDTH = 200
+PADDLE_HEIGHT = 20
+PADDLE_Y = SCREEN_HEIGHT - 50
+PADDLE_SPEED = 8
+
+BALL_RADIUS = 15
+BALL_GRAVITY = 0.2
+BALL_SPEEDS_X = np.array([-4, -3, 3, 4], dtype=np.float64)
+BALL_SPEED_Y = -5
+
+POWER_UP_RADIUS = 10
+POWER_UP_SPEED = 2
+POWER_UP_DURATION = 300  # 5 seconds at 60 FPS
+POWER_UP_TYPES = ["speed", "size", "slow", "multiball", "antigravity"]
+SPEED, SIZE, SLOW, MULTIBALL, ANTIGRAVITY = range(len(POWER_UP_TYPES))
+
+MAX_BALLS = 3  # main() never lets multiball go above 3 balls
+
+# Actions
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+
+# Observation layout (per game, float32):
+#   paddle:    x, width, speed, power-up timer
+#   balls:     x, y, speed_x, speed_y, alive        (MAX_BALLS slots)
+#   obstacles: x, y, width, height, velocity, alive (max_obstacles slots)
+#   power-ups: x, y, type index, alive              (max_power_ups slots)
+PADDLE_FEATURES = 4
+BALL_FEATURES = 5
+OBSTACLE_FEATURES = 6
+POWER_UP_FEATURES = 4
+
+
+def _per_env(value, num_envs, dtype=np.float64):
+    """Broadcast a scalar or per-environment sequence to shape (num_envs,)"""
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (num_envs,)).copy()
+
+
+class VectorEnv:
+    def __init__(self, num_envs, seed=None, obstacle_spawn_delay=120,
+                 min_obstacle_spawn_delay=60, obstacle_delay_step=100,
+                 obstacle_speedup=1.1, power_up_spawn_delay=300,
+                 gravity=BALL_GRAVITY, max_frames=None,
+                 max_obstacles=8, max_power_ups=4):
+        """Create num_envs independent games.
+
+        The obstacle spawn delay follows main()'s difficulty curve,
+        max(min_obstacle_spawn_delay, obstacle_spawn_delay - score // obstacle_delay_step),
+        and obstacle_speedup is the factor a ball's speed is multiplied by
+        when it bounces off an obstacle. Every difficulty setting accepts
+        either a scalar or one value per environment, so a single batch can
+        sweep a range of settings. max_frames ends (truncates) a game that
+        is still alive after that many frames. max_obstacles/max_power_ups are
+        slot capacities; a spawn that finds no free slot is dropped.
+        """
+        self.num_envs = num_envs
+        self.initial_obstacle_spawn_delay = _per_env(obstacle_spawn_delay, num_envs, np.int64)
+        self.min_obstacle_spawn_delay = _per_env(min_obstacle_spawn_delay, num_envs, np.int64)
+        self.obstacle_delay_step = _per_env(obstacle_delay_step, num_envs, np.int64)
+        self.obstacle_speedup = _per_env(obstacle_speedup, num_envs)
+        self.power_up_spawn_delay = _per_env(power_up_spawn_delay, num_envs, np.int64)
+        self.original_gravity = _per_env(gravity, num_envs)
+        self.max_frames = max_frames
+        self.max_obstacles = max_obstacles
+        self.max_power_ups = max_power_ups
+        self.observation_size = (PADDLE_FEATURES + BALL_FEATURES * MAX_BALLS +
+                                 OBSTACLE_FEATURES * max_obstacles +
+                                 POWER_UP_FEATURES * max_power_ups)
+
+        shape = (num_envs,)
+        ball_shape = (num_envs, MAX_BALLS)
+        obstacle_shape = (num_envs, max_obstacles)
+        power_up_shape = (num_envs, max_power_ups)
+
+        # Player
+        self.paddle_x = np.zeros(shape)
+        self.paddle_width = np.zeros(shape)
+        self.paddle_speed = np.zeros(shape)
+        self.paddle_timer = np.zeros(shape, dtype=np.int64)
+
+        # Balls
+        self.ball_alive = np.zeros(ball_shape, dtype=bool)
+        self.ball_x = np.zeros(ball_shape)
+        self.ball_y = np.zeros(ball_shape)
+        self.ball_speed_x = np.zeros(ball_shape)
+        self.ball_speed_y = np.zeros(ball_shape)
+        self.ball_gravity = np.zeros(ball_shape)
+        self.ball_timer = np.zeros(ball_shape, dtype=np.int64)
+
+        # Obstacles
+        self.obstacle_alive = np.zeros(obstacle_shape, dtype=bool)
+        self.obstacle_x = np.zeros(obstacle_shape)
+        self.obstacle_y = np.zeros(obstacle_shape)
+        self.obstacle_width = np.zeros(obstacle_shape)
+        self.obstacle_height = np.zeros(obstacle_shape)
+        self.obstacle_velocity = np.zeros(obstacle_shape)
+
+        # Power-ups
+        self.power_up_alive = np.zeros(power_up_shape, dtype=bool)
+        self.power_up_x = np.zeros(power_up_shape)
+        self.power_up_y = np.zeros(power_up_shape)
+        self.power_up_type = np.zeros(power_up_shape, dtype=np.int64)
+
+        # Game progress
+        self.score = np.zeros(shape, dtype=np.int64)
+        self.frame = np.zeros(shape, dtype=np.int64)
+        self.obstacle_timer = np.zeros(shape, dtype=np.int64)
+        self.power_up_timer = np.zeros(shape, dtype=np.int64)
+        self.obstacle_spawn_delay = np.zeros(shape, dtype=np.int64)
+
+        self._obs = np.zeros((num_envs, self.observation_size), dtype=np.float32)
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        """Give every environment its own independent random stream.
+
+        seed may be None, an int (expanded into one child seed per
+        environment) or a sequence with one seed per environment.
+        """
+        if seed is None or np.ndim(seed) == 0:
+            seeds = np.random.SeedSequence(seed).spawn(self.num_envs)
+        else:
+            if len(seed) != self.num_envs:
+                raise ValueError("Need exactly one seed per environment")
+            seeds = [np.random.SeedSequence(s) for s in seed]
+        self._rngs = [np.random.default_rng(s) for s in seeds]
+
+    def reset(self, seed=None):
+        """Start a fresh game in every environment and return observations"""
+        if seed is not None:
+            self.seed(seed)
+        for i in range(self.num_envs):
+            self._reset_env(i)
+        return self._observe()
+
+    def _reset_env(self, i):
+        self.paddle_width[i] = PADDLE_WIDTH
+        self.paddle_x[i] = SCREEN_WIDTH // 2 - PADDLE_WIDTH // 2
+        self.paddle_speed[i] = PADDLE_SPEED
+        self.paddle_timer[i] = 0
+
+        self.ball_alive[i] = False
+        self.ball_timer[i] = 0
+        self._add_ball(i, 0, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+
+        self.obstacle_alive[i] = False
+        self.power_up_alive[i] = False
+
+        self.score[i] = 0
+        self.frame[i] = 0
+        self.obstacle_timer[i] = 0
+        self.power_up_timer[i] = 0
+        self.obstacle_spawn_delay[i] = self.initial_obstacle_spawn_delay[i]
+
+    def _add_ball(self, i, slot, x, y):
+        self.ball_alive[i, slot] = True
+        self.ball_x[i, slot] = x
+        self.ball_y[i, slot] = y
+        self.ball_speed_x[i, slot] = self._rngs[i].choice(BALL_SPEEDS_X)
+        self.ball_speed_y[i, slot] = BALL_SPEED_Y
+        self.ball_gravity[i, slot] = self.original_gravity[i]
+        self.ball_timer[i, slot] = 0
+
+    def step(self, actions):
+        """Advance every game by one frame.
+
+        actions holds one of NOOP/LEFT/RIGHT per environment. Returns
+        (observations, rewards, dones, info) where rewards are the score
+        gained this frame. Finished games are reset automatically, so the
+        returned observation for a done environment is the first frame of
+        its next game; info["score"] and info["frames"] hold the final score
+        and length of the games that just ended and info["truncated"] marks
+        the ones cut off by max_frames.
+        """
+        actions = np.asarray(actions)
+        previous_score = self.score.copy()
+
+        self._update_player(actions)
+        self._update_balls()
+        self._update_obstacles()
+        self._update_power_ups()
+        self._spawn()
+        self.frame += 1
+
+        rewards = (self.score - previous_score).astype(np.float32)
+        game_over = ~self.ball_alive.any(axis=1)
+        if self.max_frames is not None:
+            truncated = ~game_over & (self.frame >= self.max_frames)
+        else:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        dones = game_over | truncated
+        info = {
+            "score": np.where(dones, self.score, 0),
+            "frames": np.where(dones, self.frame, 0),
+            "truncated": truncated,
+        }
+        for i in np.flatnonzero(dones):
+            self._reset_env(i)
+        return self._observe(), rewards, dones, info
+
+    def _update_player(self, actions):
+        # Player.move: the right check sees the position after moving left
+        move_left = (actions == LEFT) & (self.paddle_x > 0)
+        self.paddle_x -= np.where(move_left, self.paddle_speed, 0)
+        move_right = (actions == RIGHT) & (self.paddle_x < SCREEN_WIDTH - self.paddle_width)
+        self.paddle_x += np.where(move_right, self.paddle_speed, 0)
+
+        # Power-up timer, then Player.reset_power_ups when it runs out
+        running = self.paddle_timer > 0
+        self.paddle_timer -= running
+        expired = running & (self.paddle_timer == 0)
+        self.paddle_speed[expired] = PADDLE_SPEED
+        self.paddle_width[expired] = PADDLE_WIDTH
+
+    def _update_balls(self):
+        alive = self.ball_alive
+
+        # Power-up timer, then Ball.reset_power_ups when it runs out
+        running = alive & (self.ball_timer > 0)
+        self.ball_timer -= running
+        expired = running & (self.ball_timer == 0)
+        self.ball_gravity = np.where(expired, self.original_gravity[:, None], self.ball_gravity)
+
+        # Gravity and movement (dead slots are moved too but never read)
+        self.ball_speed_y += self.ball_gravity
+        self.ball_x += self.ball_speed_x
+        self.ball_y += self.ball_speed_y
+
+        # Bounce off walls and ceiling
+        wall = (self.ball_x <= BALL_RADIUS) | (self.ball_x >= SCREEN_WIDTH - BALL_RADIUS)
+        self.ball_speed_x = np.where(wall, -self.ball_speed_x, self.ball_speed_x)
+        ceiling = self.ball_y <= BALL_RADIUS
+        self.ball_speed_y = np.where(ceiling, -self.ball_speed_y, self.ball_speed_y)
+
+        # Ball.check_paddle_collision
+        paddle_x = self.paddle_x[:, None]
+        half_width = self.paddle_width[:, None] / 2
+        hit = (alive &
+               (self.ball_y + BALL_RADIUS >= PADDLE_Y) &
+               (self.ball_y - BALL_RADIUS <= PADDLE_Y + PADDLE_HEIGHT) &
+               (self.ball_x >= paddle_x) &
+               (self.ball_x <= paddle_x + self.paddle_width[:, None]))
+        if hit.any():
+            bounce_angle = ((paddle_x + half_width) - self.ball_x) / half_width * (np.pi / 3)
+            speed = np.sqrt(self.ball_speed_x ** 2 + self.ball_speed_y ** 2)
+            self.ball_speed_x = np.where(hit, -speed * np.sin(bounce_angle), self.ball_speed_x)
+            self.ball_speed_y = np.where(hit, -speed * np.cos(bounce_angle), self.ball_speed_y)
+            self.ball_y = np.where(hit, PADDLE_Y - BALL_RADIUS, self.ball_y)
+            self.score += 10 * hit.sum(axis=1)
+
+        # Ball.is_out_of_bounds
+        self.ball_alive = alive & ~(self.ball_y > SCREEN_HEIGHT + BALL_RADIUS)
+
+    def _update_obstacles(self):
+        # Obstacle.update and Obstacle.is_off_screen
+        self.obstacle_x += self.obstacle_velocity
+        off_screen = (((self.obstacle_velocity > 0) & (self.obstacle_x > SCREEN_WIDTH)) |
+                      ((self.obstacle_velocity < 0) &
+                       (self.obstacle_x + self.obstacle_width < 0)))
+        self.obstacle_alive &= ~off_screen
+
+        # Obstacle.check_ball_collision. Which side was hit only depends on
+        # positions and the speed flips commute, so visiting obstacle slots in
+        # any order gives the same result as main()'s list order.
+        ball_x, ball_y = self.ball_x, self.ball_y
+        bounce = -self.obstacle_speedup[:, None]
+        for k in np.flatnonzero(self.obstacle_alive.any(axis=0)):
+            left = self.obstacle_x[:, k, None]
+            top = self.obstacle_y[:, k, None]
+            right = left + self.obstacle_width[:, k, None]
+            bottom = top + self.obstacle_height[:, k, None]
+            hit = (self.obstacle_alive[:, k, None] & self.ball_alive &
+                   (ball_x + BALL_RADIUS > left) & (ball_x - BALL_RADIUS < right) &
+                   (ball_y + BALL_RADIUS > top) & (ball_y - BALL_RADIUS < bottom))
+            if not hit.any():
+                continue
+            overlap_left = ball_x + BALL_RADIUS - left
+            overlap_right = right - (ball_x - BALL_RADIUS)
+            overlap_top = ball_y + BALL_RADIUS - top
+            overlap_bottom = bottom - (ball_y - BALL_RADIUS)
+            min_overlap = np.minimum(np.minimum(overlap_left, overlap_right),
+                                     np.minimum(overlap_top, overlap_bottom))
+            side = (min_overlap == overlap_left) | (min_overlap == overlap_right)
+            self.ball_speed_x = np.where(hit & side, self.ball_speed_x * bounce, self.ball_speed_x)
+            self.ball_speed_y = np.where(hit & ~side, self.ball_speed_y * bounce, self.ball_speed_y)
+            self.score += 5 * hit.sum(axis=1)
+
+    def _update_power_ups(self):
+        # PowerUp.update and PowerUp.is_out_of_bounds
+        self.power_up_y += POWER_UP_SPEED
+        self.power_up_alive &= ~(self.power_up_y > SCREEN_HEIGHT + POWER_UP_RADIUS)
+
+        # PowerUp.check_paddle_collision
+        paddle_x = self.paddle_x[:, None]
+        caught = (self.power_up_alive &
+                  (self.power_up_y + POWER_UP_RADIUS >= PADDLE_Y) &
+                  (self.power_up_y - POWER_UP_RADIUS <= PADDLE_Y + PADDLE_HEIGHT) &
+                  (self.power_up_x >= paddle_x) &
+                  (self.power_up_x <= paddle_x + self.paddle_width[:, None]))
+        if not caught.any():
+            return
+
+        # Apply effects one slot at a time; several catches in the same frame
+        # must see each other's effects (e.g. "size" then "speed")
+        for k in np.flatnonzero(caught.any(axis=0)):
+            got = caught[:, k]
+            kind = self.power_up_type[:, k]
+
+            # Player.apply_power_up
+            speed = got & (kind == SPEED)
+            self.paddle_speed[speed] = PADDLE_SPEED * 1.5
+            size = got & (kind == SIZE)
+            self.paddle_width[size] = PADDLE_WIDTH * 1.5
+            self.paddle_x[size] = np.clip(self.paddle_x[size], 0,
+                                          SCREEN_WIDTH - self.paddle_width[size])
+            self.paddle_timer[speed | size] = POWER_UP_DURATION
+
+            # Ball.apply_power_up on every ball in play
+            slow = (got & (kind == SLOW))[:, None] & self.ball_alive
+            self.ball_speed_x[slow] *= 0.6
+            self.ball_speed_y[slow] *= 0.6
+            antigravity = (got & (kind == ANTIGRAVITY))[:, None] & self.ball_alive
+            self.ball_gravity[antigravity] = -0.05
+            self.ball_timer[slow | antigravity] = POWER_UP_DURATION
+
+            # Multi-ball, limited to MAX_BALLS balls
+            multiball = got & (kind == MULTIBALL) & ~self.ball_alive.all(axis=1)
+            for i in np.flatnonzero(multiball):
+                rng = self._rngs[i]
+                slot = np.argmin(self.ball_alive[i])
+                self._add_ball(i, slot,
+                               rng.integers(50, SCREEN_WIDTH - 50, endpoint=True),
+                               rng.integers(100, 300, endpoint=True))
+
+            self.power_up_alive[:, k] &= ~got
+            self.score += 20 * got
+
+    def _spawn(self):
+        # Obstacles spawn faster as the score increases
+        self.obstacle_timer += 1
+        for i in np.flatnonzero(self.obstacle_timer >= self.obstacle_spawn_delay):
+            self.obstacle_timer[i] = 0
+            self.obstacle_spawn_delay[i] = max(self.min_obstacle_spawn_delay[i],
+                                               self.initial_obstacle_spawn_delay[i] -
+                                               self.score[i] // self.obstacle_delay_step[i])
+            free = np.flatnonzero(~self.obstacle_alive[i])
+            if len(free):
+                self._add_obstacle(i, free[0])
+
+        self.power_up_timer += 1
+        for i in np.flatnonzero(self.power_up_timer >= self.power_up_spawn_delay):
+            self.power_up_timer[i] = 0
+            free = np.flatnonzero(~self.power_up_alive[i])
+            if len(free):
+                self._add_power_up(i, free[0])
+
+    def _add_obstacle(self, i, slot):
+        rng = self._rngs[i]
+        width = rng.integers(30, 80, endpoint=True)
+        from_left = rng.integers(2) == 0
+        self.obstacle_alive[i, slot] = True
+        self.obstacle_width[i, slot] = width
+        self.obstacle_height[i, slot] = rng.integers(10, 30, endpoint=True)
+        self.obstacle_x[i, slot] = -width if from_left else SCREEN_WIDTH
+        self.obstacle_y[i, slot] = rng.integers(100, SCREEN_HEIGHT - 200, endpoint=True)
+        speed = rng.integers(3, 7, endpoint=True)
+        self.obstacle_velocity[i, slot] = speed if from_left else -speed
+
+    def _add_power_up(self, i, slot):
+        rng = self._rngs[i]
+        self.power_up_alive[i, slot] = True
+        self.power_up_x[i, slot] = rng.integers(50, SCREEN_WIDTH - 50, endpoint=True)
+        self.power_up_y[i, slot] = rng.integers(100, SCREEN_HEIGHT - 200, endpoint=True)
+        self.power_up_type[i, slot] = rng.integers(len(POWER_UP_TYPES))
+
+    def _observe(self):
+        obs = self._obs
+        obs[:, 0] = self.paddle_x
+        obs[:, 1] = self.paddle_width
+        obs[:, 2] = self.paddle_speed
+        obs[:, 3] = self.paddle_timer
+
+        start = PADDLE_FEATURES
+        end = start + BALL_FEATURES * MAX_BALLS
+        for offset, column in enumerate((self.ball_x, self.ball_y, self.ball_speed_x,
+                                         self.ball_speed_y, self.ball_alive)):
+            obs[:, start + offset:end:BALL_FEATURES] = column
+
+        start = end
+        end = start + OBSTACLE_FEATURES * self.max_obstacles
+        for offset, column in enumerate((self.obstacle_x, self.obstacle_y,
+                                         self.obstacle_width, self.obstacle_height,
+                                         self.obstacle_velocity, self.obstacle_alive)):
+            obs[:, start + offset:end:OBSTACLE_FEATURES] = column
+
+        start = end
+        end = start + POWER_UP_FEATURES * self.max_power_ups
+        for offset, column in enumerate((self.power_up_x, self.power_up_y,
+                                         self.power_up_type, self.power_up_alive)):
+            obs[:, start + offset:end:POWER_UP_FEATURES] = column
+
+        return obs.copy()
+
+
+def tracking_policy(obs):
+    """Scripted bot: move the paddle under the lowest ball in play"""
+    start = PADDLE_FEATURES
+    end = start + BALL_FEATURES * MAX_BALLS
+    balls = obs[:, start:end].reshape(len(obs), MAX_BALLS, BALL_FEATURES)
+    ball_y = np.where(balls[:, :, 4] > 0, balls[:, :, 1], -np.inf)
+    lowest = np.argmax(ball_y, axis=1)
+    target_x = balls[np.arange(len(obs)), lowest, 0]
+    paddle_center = obs[:, 0] + obs[:, 1] / 2
+    return np.where(target_x < paddle_center - PADDLE_SPEED, LEFT,
+                    np.where(target_x > paddle_center + PADDLE_SPEED, RIGHT, NOOP))
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark the batched simulator")
+    parser.add_argument("--envs", type=int, default=4096)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = VectorEnv(args.envs, seed=args.seed)
+    obs = env.reset()
+    games = 0
+    start_time = time.perf_counter()
+    for _ in range(args.steps):
+        obs, rewards, dones, info = env.step(tracking_policy(obs))
+        games += dones.sum()
+    elapsed = time.perf_counter() - start_time
+    print(f"{args.envs * args.steps / elapsed:,.0f} env-steps/s "
+          f"({games} games finished in {elapsed:.2f}s)")
@@ -0,0 +1,288 @@
+"""Local game telemetry.
+
+TelemetryRecorder keeps the events of the current game session in three
+in-memory columns (tick, event, value). Recording an event only appends to
+those arrays. Every few seconds, and when a session ends, the columns are
+handed to a background thread which appends them as one block to the
+session's file, so the game loop never waits on the disk.
+
+Session file format (little endian):
+
+    file    := header block*
+    header  := b"BMTL" version:u16 tick_rate:u16 start_time_ms:u64
+    block   := length:u32 crc32:u32 payload            (length of payload)
+    payload := count:u32 ticks:u32[count] events:u8[count] values:i32[count]
+
+A block cut short by a crash fails its length or CRC check and is ignored
+along with anything after it.
+
+Run this module to aggregate many session files:
+
+    python telemetry.py telemetry/ --csv sessions.csv
+"""
+import argparse
+import csv
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from array import array
+from collections import Counter
+
+MAGIC = b"BMTL"
+VERSION = 1
+FLUSH_INTERVAL = 5.0  # Seconds between background flushes
+FILE_SUFFIX = ".bmt"
+
+# Events; the value column holds the detail noted next to each
+SESSION_START = 0
+SESSION_END = 1       # final score
+SESSION_ABORT = 2     # score when the game was quit mid-session
+PADDLE_HIT = 3
+OBSTACLE_HIT = 4
+BALL_LOST = 5         # balls left in play
+POWER_UP = 6          # index into POWER_UP_TYPES
+EVENT_NAMES = ["session_start", "session_end", "session_abort", "paddle_hit",
+               "obstacle_hit", "ball_lost", "power_up"]
+
+POWER_UP_TYPES = ["speed", "size", "slow", "multiball", "antigravity"]
+
+_header = struct.Struct("<4sHHQ")
+_block_header = struct.Struct("<II")
+_count = struct.Struct("<I")
+
+
+def power_up_code(power_up_type):
+    return POWER_UP_TYPES.index(power_up_type)
+
+
+def _new_columns():
+    return array("I"), array("B"), array("i")
+
+
+def _little_endian(column):
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_block(ticks, events, values):
+    payload = (_count.pack(len(ticks)) + _little_endian(ticks) +
+               events.tobytes() + _little_endian(values))
+    return _block_header.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+class TelemetryRecorder:
+    """Records session events in memory and writes them in the background"""
+
+    def __init__(self, directory, tick_rate, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.tick_rate = tick_rate
+        self.flush_interval = flush_interval
+        self.enabled = True
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"Telemetry disabled, could not create {directory}: {e}")
+            self.enabled = False
+
+        self.path = None  # File of the current session
+        self.tick = 0
+        self.ticks, self.events, self.values = _new_columns()
+        self.last_flush = time.monotonic()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_blocks, name="telemetry",
+                                        daemon=True)
+        if self.enabled:
+            self._writer.start()
+
+    @property
+    def in_session(self):
+        return self.path is not None
+
+    def start_session(self):
+        if not self.enabled:
+            return
+        if self.in_session:
+            self.end_session(0, aborted=True)
+        started = time.time()
+        name = time.strftime("session-%Y%m%d-%H%M%S", time.localtime(started))
+        self.path = os.path.join(self.directory,
+                                 f"{name}-{uuid.uuid4().hex[:8]}{FILE_SUFFIX}")
+        self.tick = 0
+        header = _header.pack(MAGIC, VERSION, self.tick_rate, int(started * 1000))
+        self._queue.put((self.path, header, None))
+        self.record(SESSION_START)
+
+    def advance(self):
+        """Count one simulation tick of the current session"""
+        self.tick += 1
+
+    def record(self, event, value=0):
+        if self.in_session:
+            self.ticks.append(self.tick)
+            self.events.append(event)
+            self.values.append(value)
+
+    def end_session(self, score, aborted=False):
+        if not self.in_session:
+            return
+        self.record(SESSION_ABORT if aborted else SESSION_END, score)
+        self.flush()
+        self.path = None
+
+    def maybe_flush(self):
+        """Call once per frame; hands the buffer to the writer every flush_interval"""
+        if self.in_session and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.ticks:
+            return
+        # Swap in fresh columns; the writer thread owns the old ones now
+        columns = (self.ticks, self.events, self.values)
+        self.ticks, self.events, self.values = _new_columns()
+        self._queue.put((self.path, None, columns))
+
+    def close(self, score=0):
+        """End any running session and wait for pending writes"""
+        if not self.enabled:
+            return
+        self.end_session(score, aborted=True)
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_blocks(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            path, header, columns = job
+            try:
+                with open(path, "ab") as f:
+                    f.write(header if header is not None else encode_block(*columns))
+            except OSError as e:
+                print(f"Error writing telemetry: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Reading and aggregation
+
+def read_session(path):
+    """Read a session file into (info, ticks, events, values) columns"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, tick_rate, start_time_ms = _header.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a telemetry file")
+    ticks, events, values = _new_columns()
+    offset = _header.size
+    while offset + _block_header.size <= len(data):
+        length, crc = _block_header.unpack_from(data, offset)
+        payload = data[offset + _block_header.size:offset + _block_header.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break  # Torn write at the end of the file
+        count = _count.unpack_from(payload)[0]
+        position = _count.size
+        for column, size in ((ticks, 4), (events, 1), (values, 4)):
+            chunk = array(column.typecode, payload[position:position + count * size])
+            if sys.byteorder == "big" and size > 1:
+                chunk.byteswap()
+            column.extend(chunk)
+            position += count * size
+        offset += _block_header.size + length
+    info = {"path": path, "tick_rate": tick_rate, "start_time": start_time_ms / 1000}
+    return info, ticks, events, values
+
+
+def summarize_session(info, ticks, events, values):
+    """Per-session counts from the event columns"""
+    counts = Counter(events)
+    power_ups = Counter(values[i] for i in range(len(events)) if events[i] == POWER_UP)
+    score = None
+    ended = "incomplete"
+    for i in range(len(events) - 1, -1, -1):
+        if events[i] == SESSION_END or events[i] == SESSION_ABORT:
+            score = values[i]
+            ended = "game_over" if events[i] == SESSION_END else "aborted"
+            break
+    summary = {
+        "file": os.path.basename(info["path"]),
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info["start_time"])),
+        "seconds": round((ticks[-1] if ticks else 0) / info["tick_rate"], 2),
+        "ended": ended,
+        "score": score,
+        "paddle_hits": counts[PADDLE_HIT],
+        "obstacle_hits": counts[OBSTACLE_HIT],
+        "balls_lost": counts[BALL_LOST],
+    }
+    for code, name in enumerate(POWER_UP_TYPES):
+        summary[f"power_up_{name}"] = power_ups[code]
+    return summary
+
+
+def session_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(FILE_SUFFIX):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def export(paths, csv_path=None):
+    """Summarize every session file; optionally write one CSV row per session"""
+    sessions = []
+    for path in session_files(paths):
+        try:
+            sessions.append(summarize_session(*read_session(path)))
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Skipping {path}: {e}")
+
+    if csv_path and sessions:
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(sessions[0]))
+            writer.writeheader()
+            writer.writerows(sessions)
+        print(f"Wrote {len(sessions)} sessions to {csv_path}")
+
+    totals = Counter()
+    for session in sessions:
+        for key, value in session.items():
+            if isinstance(value, (int, float)) and key != "score":
+                totals[key] += value
+    scores = [s["score"] for s in sessions if s["score"] is not None]
+    return {
+        "sessions": len(sessions),
+        "completed": sum(1 for s in sessions if s["ended"] == "game_over"),
+        "total_minutes": round(totals["seconds"] / 60, 1),
+        "mean_session_seconds": round(totals["seconds"] / len(sessions), 1) if sessions else 0,
+        "mean_score": round(sum(scores) / len(scores), 1) if scores else 0,
+        "max_score": max(scores) if scores else 0,
+        "paddle_hits": totals["paddle_hits"],
+        "obstacle_hits": totals["obstacle_hits"],
+        "balls_lost": totals["balls_lost"],
+        "power_ups": {name: totals[f"power_up_{name}"] for name in POWER_UP_TYPES},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate Bounce Master telemetry files")
+    parser.add_argument("paths", nargs="*", default=["telemetry"],
+                        help="Session files or directories (default: telemetry)")
+    parser.add_argument("--csv", help="Write one row per session to this CSV file")
+    args = parser.parse_args()
+
+    for key, value in export(args.paths, args.csv).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Headless run through every game screen on each render backend.
+
+Uses SDL's dummy video driver, so no display is needed; "software-texture"
+exercises TextureRenderer through SDL's software renderer.
+"""
+import asyncio
+import os
+import random
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+import leaderboard_api
+import main
+import render
+
+FRAME = 1 / 60
+SCREEN_TIMEOUT = 15.0  # Seconds to wait for a screen to be drawn
+
+
+class HeldKeys:
+    """Stands in for pygame.key.get_pressed()"""
+
+    def __init__(self):
+        self.held = set()
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+def press(key, unicode=""):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0))
+
+
+async def wait_for_text(game, drawn, text):
+    """Wait until the game draws text; fails if the game loop died first"""
+    for _ in range(int(SCREEN_TIMEOUT / FRAME)):
+        if game.done():
+            game.result()  # Re-raises the game loop's exception
+            raise AssertionError(f"game ended before drawing {text!r}")
+        if text in drawn:
+            return
+        await asyncio.sleep(FRAME)
+    raise AssertionError(f"{text!r} was never drawn")
+
+
+async def play_every_screen(drawn, keys):
+    game = asyncio.ensure_future(main.run_game())
+    try:
+        # GAME_PLAYING: catch the ball once so there is a score, then miss
+        keys.held = {pygame.K_RIGHT}
+        await wait_for_text(game, drawn, "Score: 10")
+        keys.held = {pygame.K_LEFT}
+
+        # GAME_OVER
+        await wait_for_text(game, drawn, "GAME OVER")
+        await wait_for_text(game, drawn, "Press SPACE to submit your score")
+        press(pygame.K_SPACE)
+
+        # ENTER_NAME, first with the empty name
+        await wait_for_text(game, drawn, "Enter Your Name:")
+        await wait_for_text(game, drawn, "")
+        press(pygame.K_a, "a")
+        press(pygame.K_b, "b")
+        await wait_for_text(game, drawn, "ab")
+        press(pygame.K_RETURN, "\r")
+
+        # SUBMITTING, then SHOW_LEADERBOARD
+        await wait_for_text(game, drawn, "Submitting score...")
+        await wait_for_text(game, drawn, "LEADERBOARD")
+        await wait_for_text(game, drawn, "Press SPACE to play again")
+
+        # Back to GAME_PLAYING
+        drawn.clear()
+        keys.held = set()
+        press(pygame.K_SPACE)
+        await wait_for_text(game, drawn, "Score: 0")
+    finally:
+        press(pygame.K_ESCAPE)
+        await asyncio.wait_for(game, SCREEN_TIMEOUT)
+
+
+@pytest.mark.parametrize("backend", ["software-texture", "surface"])
+def test_every_game_screen(backend, tmp_path, monkeypatch):
+    drawn = set()
+    keys = HeldKeys()
+
+    def recording_renderer(*args, **kwargs):
+        renderer = render.create_renderer(*args, backend=backend, **kwargs)
+        if backend == "software-texture":
+            assert isinstance(renderer, render.TextureRenderer)
+        render_text = renderer.render_text
+
+        def record(font, text, color):
+            image = render_text(font, text, color)
+            drawn.add(text)
+            return image
+
+        renderer.render_text = record
+        return renderer
+
+    monkeypatch.setattr(main, "create_renderer", recording_renderer)
+    monkeypatch.setattr(main, "TELEMETRY_DIR", str(tmp_path / "telemetry"))
+    monkeypatch.setattr(pygame.key, "get_pressed", lambda: keys)
+    # Use a fresh local leaderboard so a score can always be submitted
+    monkeypatch.delenv("LEADERBOARD_API_KEY", raising=False)
+    monkeypatch.setattr(leaderboard_api, "LOCAL_LEADERBOARD_FILE",
+                        str(tmp_path / "leaderboard.bmlb"))
+    # The first ball heads right, where the paddle is sent to catch it
+    random.seed(0)
+    pygame.event.clear()
+
+    asyncio.run(play_every_screen(drawn, keys))
@@ -0,0 +1,402 @@
+"""Head-to-head two-player mode over the LAN.
+
+One kiosk hosts the arena and plays as player 1; the other joins and plays
+as player 2. Both paddles share the same balls, obstacles and power-ups and
+the game ends when the last ball is lost. See netplay.py for the protocol.
+
+    python versus.py --host               # on the first kiosk
+    python versus.py --join 192.168.1.20  # on the second kiosk
+    python versus.py --loopback --latency 80 --loss 5   # headless harness
+"""
+import argparse
+import random
+import socket
+import sys
+from collections import deque
+
+import pygame
+
+from main import (Player, Ball, Obstacle, PowerUp, init_display, clock,
+                  SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK, RED, GREEN, BLUE,
+                  YELLOW, PURPLE, ORANGE, CYAN, GRAY)
+from netplay import (HostSession, ClientSession, UdpTransport, LoopbackNetwork,
+                     encode_record, record_position, DEFAULT_PORT, TICK_RATE,
+                     PADDLE, BALL, OBSTACLE, POWER_UP)
+
+# Colors are sent as an index into this palette
+PALETTE = [WHITE, BLACK, RED, GREEN, BLUE, YELLOW, PURPLE, ORANGE, CYAN, GRAY]
+POWER_UP_TYPES = PowerUp().types
+PADDLE_HEIGHT = Player().height
+
+PLAYING = 0
+GAME_OVER = 1
+
+
+class VersusArena:
+    """Authoritative two-player game state, using the single-player rules"""
+
+    def __init__(self):
+        self._next_id = 2  # Ids 0 and 1 are the two paddles
+        self.reset()
+
+    def reset(self):
+        self.players = [Player(), Player()]
+        for index, player in enumerate(self.players):
+            player.x = SCREEN_WIDTH * (2 * index + 1) // 4 - player.width // 2
+        self.scores = [0, 0]
+        self.balls = []
+        self._add_ball(Ball())
+        self.obstacles = []
+        self.power_ups = []
+        self.obstacle_timer = 0
+        self.power_up_timer = 0
+        self.obstacle_spawn_delay = 120
+        self.power_up_spawn_delay = 300
+        self.game_over = False
+
+    def _track(self, entity):
+        entity.net_id = self._next_id
+        # Ids are 16 bits on the wire; wrapping is safe because no entity
+        # lives anywhere near 65534 spawns
+        self._next_id = self._next_id + 1 if self._next_id < 0xFFFF else 2
+        return entity
+
+    def _add_ball(self, ball):
+        ball.last_hit_by = None  # Player credited for obstacle hits
+        self.balls.append(self._track(ball))
+
+    def step(self, directions):
+        """Advance one frame; directions holds -1, 0 or 1 per player"""
+        for player, direction in zip(self.players, directions):
+            player.update({pygame.K_LEFT: direction < 0, pygame.K_RIGHT: direction > 0})
+
+        for ball in self.balls[:]:
+            ball.update()
+            for index, player in enumerate(self.players):
+                if ball.check_paddle_collision(player):
+                    self.scores[index] += 10
+                    ball.last_hit_by = index
+                    break
+            if ball.is_out_of_bounds():
+                self.balls.remove(ball)
+                if len(self.balls) == 0:
+                    self.game_over = True
+
+        for obstacle in self.obstacles[:]:
+            obstacle.update()
+            if obstacle.is_off_screen():
+                self.obstacles.remove(obstacle)
+            else:
+                for ball in self.balls:
+                    if obstacle.check_ball_collision(ball) and ball.last_hit_by is not None:
+                        self.scores[ball.last_hit_by] += 5
+
+        for power_up in self.power_ups[:]:
+            power_up.update()
+            if power_up.is_out_of_bounds():
+                self.power_ups.remove(power_up)
+                continue
+            for index, player in enumerate(self.players):
+                if power_up.check_paddle_collision(player):
+                    self._apply_power_up(power_up.type, player)
+                    self.power_ups.remove(power_up)
+                    self.scores[index] += 20
+                    break
+
+        self.obstacle_timer += 1
+        if self.obstacle_timer >= self.obstacle_spawn_delay:
+            self.obstacles.append(self._track(Obstacle()))
+            self.obstacle_timer = 0
+            self.obstacle_spawn_delay = max(60, 120 - (max(self.scores) // 100))
+
+        self.power_up_timer += 1
+        if self.power_up_timer >= self.power_up_spawn_delay:
+            self.power_ups.append(self._track(PowerUp()))
+            self.power_up_timer = 0
+
+    def _apply_power_up(self, power_up_type, player):
+        if power_up_type == "speed" or power_up_type == "size":
+            player.apply_power_up(power_up_type)
+        elif power_up_type == "slow" or power_up_type == "antigravity":
+            for ball in self.balls:
+                ball.apply_power_up(power_up_type)
+        elif power_up_type == "multiball" and len(self.balls) < 3:
+            self._add_ball(Ball(x=random.randint(50, SCREEN_WIDTH - 50),
+                                y=random.randint(100, 300)))
+
+    def snapshot(self):
+        """Entity id -> wire record for every entity in the arena"""
+        state = {}
+        for index, player in enumerate(self.players):
+            state[index] = encode_record(PADDLE, player.x, player.y, player.width,
+                                         player.speed, PALETTE.index(player.color))
+        for ball in self.balls:
+            state[ball.net_id] = encode_record(BALL, ball.x, ball.y, ball.radius, 0,
+                                               PALETTE.index(ball.color))
+        for obstacle in self.obstacles:
+            state[obstacle.net_id] = encode_record(OBSTACLE, obstacle.x, obstacle.y,
+                                                   obstacle.width, obstacle.height,
+                                                   PALETTE.index(obstacle.color))
+        for power_up in self.power_ups:
+            state[power_up.net_id] = encode_record(POWER_UP, power_up.x, power_up.y,
+                                                   power_up.radius,
+                                                   POWER_UP_TYPES.index(power_up.type),
+                                                   PALETTE.index(power_up.color))
+        return state
+
+
+_probe = Player()
+
+
+def paddle_move(x, width, speed, direction):
+    """One tick of Player.move, for client-side prediction"""
+    _probe.x, _probe.width, _probe.speed = x, width, speed
+    if direction < 0:
+        _probe.move("left")
+    elif direction > 0:
+        _probe.move("right")
+    return _probe.x
+
+
+def key_direction(keys):
+    return (1 if keys[pygame.K_RIGHT] else 0) - (1 if keys[pygame.K_LEFT] else 0)
+
+
+def draw_state(screen, state, local_index=None):
+    """Draw a snapshot state with a render backend; the local paddle gets a white outline"""
+    for entity_id, record in state.items():
+        kind, a, b, style = record[0], record[3], record[4], record[5]
+        x, y = record_position(record)
+        color = PALETTE[style] if 0 <= style < len(PALETTE) else WHITE
+        if kind == PADDLE:
+            screen.rect(color, (x, y, a, PADDLE_HEIGHT))
+            if entity_id == local_index:
+                screen.rect(WHITE, (x, y, a, PADDLE_HEIGHT), 2)
+        elif kind == BALL:
+            screen.circle(color, (int(x), int(y)), a)
+        elif kind == OBSTACLE:
+            screen.rect(color, (x, y, a, b))
+        elif kind == POWER_UP:
+            screen.circle(color, (int(x), int(y)), a)
+            screen.circle(BLACK, (int(x), int(y)), a // 2)
+
+
+def draw_hud(screen, font, small_font, scores, local_index, status, stats, message=None):
+    for index, score in enumerate(scores):
+        label = f"P{index + 1}{' (you)' if index == local_index else ''}: {score}"
+        text = screen.render_text(font, label, WHITE)
+        x = 10 if index == 0 else SCREEN_WIDTH - text.get_width() - 10
+        screen.blit(text, (x, 10))
+
+    rtt = "-" if stats.rtt is None else f"{stats.rtt * 1000:.0f} ms"
+    net_text = screen.render_text(small_font, f"{stats.bytes_per_tick():.0f} B/tick  RTT {rtt}  "
+                                  f"loss {stats.loss() * 100:.1f}%", GRAY)
+    screen.blit(net_text, (10, SCREEN_HEIGHT - 20))
+
+    if status == GAME_OVER:
+        if scores[0] == scores[1]:
+            result = "DRAW"
+        else:
+            result = f"PLAYER {1 if scores[0] > scores[1] else 2} WINS"
+        text = screen.render_text(font, f"GAME OVER - {result}", WHITE)
+        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT//2 - 50))
+    if message:
+        text = screen.render_text(font, message, WHITE)
+        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT//2))
+
+
+def run_host(port):
+    screen = init_display("Bounce Master - Versus (host)")
+    font = pygame.font.SysFont(None, 36)
+    small_font = pygame.font.SysFont(None, 24)
+    session = HostSession(UdpTransport(port=port))
+    arena = VersusArena()
+    print(f"Hosting on port {port}")
+
+    tick = 0
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE and arena.game_over:
+                    arena.reset()
+
+        session.poll()
+        if session.connected and not arena.game_over:
+            arena.step((key_direction(pygame.key.get_pressed()), session.next_input()))
+        tick += 1
+        state = arena.snapshot()
+        status = GAME_OVER if arena.game_over else PLAYING
+        session.end_tick(tick, state, arena.scores, status)
+
+        screen.fill(BLACK)
+        draw_state(screen, state, local_index=0)
+        if not session.connected:
+            message = f"Waiting for player 2 on port {port}"
+        elif arena.game_over:
+            message = "Press SPACE to play again"
+        else:
+            message = None
+        draw_hud(screen, font, small_font, arena.scores, 0, status, session.stats, message)
+        screen.present()
+        clock.tick(TICK_RATE)
+
+    session.transport.close()
+    pygame.quit()
+
+
+def run_client(host, port):
+    screen = init_display("Bounce Master - Versus")
+    font = pygame.font.SysFont(None, 36)
+    small_font = pygame.font.SysFont(None, 24)
+    session = ClientSession(UdpTransport(), (socket.gethostbyname(host), port), paddle_move)
+    print(f"Joining {host}:{port}")
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+
+        session.poll()
+        session.send_input(key_direction(pygame.key.get_pressed()))
+        session.end_tick()
+
+        screen.fill(BLACK)
+        draw_state(screen, session.view(), session.player_index)
+        if not session.connected:
+            message = f"Connecting to {host}:{port}..."
+        elif session.status == GAME_OVER:
+            message = "Waiting for the host to restart"
+        else:
+            message = None
+        draw_hud(screen, font, small_font, session.scores, session.player_index,
+                 session.status, session.stats, message)
+        screen.present()
+        clock.tick(TICK_RATE)
+
+    session.transport.close()
+    pygame.quit()
+
+
+def run_loopback(seconds=30, latency=0.05, jitter=0.01, loss=0.0, seed=0):
+    """Play host and client against each other over a simulated network.
+
+    Runs headless on a simulated clock: both paddles are driven by a simple
+    bot that follows the lowest ball, and the arena restarts whenever a game
+    ends. Returns the host and client metrics plus how far the client's
+    view drifted from the authoritative arena.
+    """
+    random.seed(seed)
+    now = [0.0]
+    network = LoopbackNetwork(latency / 2, jitter, loss, seed, clock=lambda: now[0])
+    host = HostSession(network.endpoint("host"), clock=lambda: now[0])
+    client = ClientSession(network.endpoint("client"), "host", paddle_move,
+                           clock=lambda: now[0])
+    arena = VersusArena()
+
+    host_states = deque(maxlen=TICK_RATE * 2)  # (tick, state) on the host
+    host_paddle = {}                           # input seq -> host paddle x
+    predicted_paddle = {}                      # input seq -> predicted paddle x
+    position_errors = []
+
+    def bot(state, index):
+        paddle = state[index]
+        balls = [record_position(r) for r in state.values() if r[0] == BALL]
+        if not balls:
+            return 0
+        target_x = max(balls, key=lambda p: p[1])[0]
+        center = record_position(paddle)[0] + paddle[3] / 2
+        return -1 if target_x < center - 8 else 1 if target_x > center + 8 else 0
+
+    for tick in range(1, int(seconds * TICK_RATE) + 1):
+        now[0] = tick / TICK_RATE
+
+        client.poll()
+        view = client.view()
+        if client.connected and client.player_index in view:
+            client.send_input(bot(view, client.player_index))
+            if client.predictor.x is not None:
+                predicted_paddle[client.seq] = client.predictor.x
+
+        host.poll()
+        if arena.game_over:
+            arena.reset()
+        if host.connected:
+            state = arena.snapshot()
+            arena.step((bot(state, 0), host.next_input()))
+            host_paddle[host.processed_seq] = arena.players[1].x
+        state = arena.snapshot()
+        host_states.append((tick, state))
+        host.end_tick(tick, state, arena.scores,
+                      GAME_OVER if arena.game_over else PLAYING)
+        client.end_tick()
+
+        # Compare the client's interpolated balls to the host's own state at
+        # the (fractional) tick the client is rendering
+        render_tick = client.buffer.render_tick
+        if render_tick is not None:
+            history = dict(host_states)
+            before = history.get(int(render_tick))
+            after = history.get(int(render_tick) + 1)
+            if before is not None and after is not None:
+                alpha = render_tick - int(render_tick)
+                for entity_id, record in client.buffer.sample().items():
+                    if record[0] != BALL or entity_id not in before or entity_id not in after:
+                        continue
+                    x, y = record_position(record)
+                    (x0, y0), (x1, y1) = (record_position(before[entity_id]),
+                                          record_position(after[entity_id]))
+                    position_errors.append(abs(x - (x0 + (x1 - x0) * alpha)) +
+                                           abs(y - (y0 + (y1 - y0) * alpha)))
+
+    mispredicted = sum(1 for seq, x in predicted_paddle.items()
+                       if seq in host_paddle and host_paddle[seq] != x)
+    return {
+        "host": host.stats.summary(),
+        "client": client.stats.summary(),
+        "dropped_packets": network.dropped,
+        "inputs_checked": sum(1 for seq in predicted_paddle if seq in host_paddle),
+        "mispredicted_inputs": mispredicted,
+        "mean_ball_error_px": (round(sum(position_errors) / len(position_errors), 2)
+                               if position_errors else None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bounce Master two-player mode")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--host", action="store_true", help="Host the arena as player 1")
+    mode.add_argument("--join", metavar="HOST[:PORT]", help="Join a host as player 2")
+    mode.add_argument("--loopback", action="store_true",
+                      help="Run the headless host/client harness and print metrics")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    harness = parser.add_argument_group("loopback harness")
+    harness.add_argument("--seconds", type=float, default=30)
+    harness.add_argument("--latency", type=float, default=50, help="Round-trip latency in ms")
+    harness.add_argument("--jitter", type=float, default=10, help="Extra one-way delay in ms")
+    harness.add_argument("--loss", type=float, default=0, help="Packet loss in percent")
+    harness.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.loopback:
+        results = run_loopback(args.seconds, args.latency / 1000, args.jitter / 1000,
+                               args.loss / 100, args.seed)
+        for section, value in results.items():
+            print(f"{section}: {value}")
+    elif args.host:
+        run_host(args.port)
+    else:
+        host, _, port = args.join.partition(":")
+        run_client(host, int(port) if port else args.port)
+    sys.exit()
+
+
+if __name__ == "__main__":
+    main()